@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/extract_productdata_multi 종단간 처리량 벤치마크 (네이버 대신 로컬 mock_upstream.py 사용)
+- mock_upstream.py를 띄우고, 크기마다 hello.py 서버를 새로 띄워서 UPSTREAM_BASE_URL로 mock에 연결
+- nvmid 100 / 1000 / 10000개(--sizes)를 스트리밍 모드로 요청해서 nvmid별 도착 시각을 기록
+- 처리량(nvmid/초), 요청 시작부터 nvmid별 도착까지 p50 / p95 / p99, 서버 프로세스 최대 RSS 출력
+- 서버 캐시는 끄고(PRODUCT_CACHE_TTL=0) 실행마다 다른 nvmid를 써서 매번 업스트림까지 호출
+
+사용법: python benchmark.py [--sizes 100,1000,10000] [--server flask|async] [--repeat 1] [--json 결과.json]
+        [--latency-ms 50] [--latency-dist lognormal] [--error-rate 0] [--empty-rate 0] [--rate-429 0]
+        [--server-env KEY=VALUE ...]   # 예: --server-env UPSTREAM_RATE_PER_COOKIE=300
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+import json_codec
+
+try:
+    import psutil
+except ImportError:  # 선택 의존성 (/proc가 없는 환경의 RSS 측정용)
+    psutil = None
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BENCH_COOKIES = "NID_SES=benchmark"
+NVMID_BASE = 90000000000
+
+
+def wait_until_ready(url: str, timeout: float = 30.0):
+    """url이 200을 반환할 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"준비되지 않았습니다: {url}")
+
+
+def peak_rss_mb(pid: int) -> float | None:
+    """프로세스의 최대 RSS (MB). Linux는 /proc의 VmHWM, 그 외에는 psutil이 있을 때만"""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if psutil is not None:
+        info = psutil.Process(pid).memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+    return None
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """정렬된 값에서 nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def run_once(service_url: str, nvmids: list) -> dict:
+    """
+    nvmid 목록을 스트리밍 모드로 한 번 요청하고 측정값 반환
+
+    Returns:
+        dict: elapsed / throughput / p50 / p95 / p99 (초) / success / fail
+    """
+    body = json_codec.dumps({"nvmids": nvmids, "cookies": BENCH_COOKIES, "stream": True})
+    arrivals = []
+    success = fail = 0
+    start = time.perf_counter()
+    with requests.post(f"{service_url}/extract_productdata_multi", data=body, stream=True, timeout=600,
+                       headers={"Content-Type": "application/json", "Accept": "application/x-ndjson"}) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            item = json_codec.loads(line)
+            if item.get("summary"):
+                continue
+            arrivals.append(time.perf_counter() - start)
+            if item.get("success"):
+                success += 1
+            else:
+                fail += 1
+    elapsed = time.perf_counter() - start
+    arrivals.sort()
+    return {
+        "elapsed": elapsed,
+        "throughput": len(nvmids) / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(arrivals, 50),
+        "p95": percentile(arrivals, 95),
+        "p99": percentile(arrivals, 99),
+        "success": success,
+        "fail": fail,
+    }
+
+
+def start_server(server_mode: str, port: int, upstream_url: str, extra_env: dict) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "UPSTREAM_BASE_URL": upstream_url,
+        "PRODUCT_CACHE_TTL": "0",
+        "PRODUCT_CACHE_DB": "",
+        **extra_env,
+    }
+    return subprocess.Popen([sys.executable, str(SCRIPT_DIR / "hello.py"), "--serve", "--server", server_mode],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop_process(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/extract_productdata_multi 처리량 벤치마크 (mock 업스트림)")
+    parser.add_argument("--sizes", default="100,1000,10000", help="nvmid 개수 목록 (쉼표 구분)")
+    parser.add_argument("--repeat", type=int, default=1, help="크기별 반복 횟수")
+    parser.add_argument("--server", choices=["flask", "async"], default="async")
+    parser.add_argument("--port", type=int, default=18181)
+    parser.add_argument("--mock-port", type=int, default=18080)
+    parser.add_argument("--latency-ms", default="50")
+    parser.add_argument("--latency-dist", default="lognormal")
+    parser.add_argument("--latency-jitter", default="0.5")
+    parser.add_argument("--error-rate", default="0")
+    parser.add_argument("--empty-rate", default="0")
+    parser.add_argument("--rate-429", default="0")
+    parser.add_argument("--server-env", action="append", default=[], help="서버 환경 변수 KEY=VALUE (여러 번 가능)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    extra_env = dict(item.split("=", 1) for item in args.server_env)
+    service_url = f"http://127.0.0.1:{args.port}"
+    mock_url = f"http://127.0.0.1:{args.mock_port}"
+
+    mock = subprocess.Popen([
+        sys.executable, str(SCRIPT_DIR / "mock_upstream.py"), "--port", str(args.mock_port),
+        "--latency-ms", args.latency_ms, "--latency-dist", args.latency_dist, "--latency-jitter", args.latency_jitter,
+        "--error-rate", args.error_rate, "--empty-rate", args.empty_rate, "--rate-429", args.rate_429,
+    ], stdout=subprocess.DEVNULL)
+    rows = []
+    try:
+        wait_until_ready(f"{mock_url}/stats")
+        print(f"{'size':>6} {'run':>3} {'elapsed':>8} {'ids/s':>8} {'p50':>7} {'p95':>7} {'p99':>7} "
+              f"{'ok':>6} {'fail':>5} {'upstream':>8} {'rss MB':>7}")
+        offset = 0
+        for size in sizes:
+            # 크기마다 서버를 새로 띄워서 최대 RSS를 크기별로 측정
+            server = start_server(args.server, args.port, mock_url, extra_env)
+            try:
+                wait_until_ready(f"{service_url}/health")
+                for run in range(args.repeat):
+                    nvmids = [str(NVMID_BASE + offset + i) for i in range(size)]
+                    offset += size
+                    upstream_before = requests.get(f"{mock_url}/stats", timeout=5).json()["requests"]
+                    result = run_once(service_url, nvmids)
+                    result["upstream_requests"] = requests.get(f"{mock_url}/stats", timeout=5).json()["requests"] - upstream_before
+                    result["peak_rss_mb"] = peak_rss_mb(server.pid)
+                    result.update({"size": size, "run": run + 1, "server": args.server})
+                    rows.append(result)
+                    rss = f"{result['peak_rss_mb']:.1f}" if result["peak_rss_mb"] is not None else "-"
+                    print(f"{size:>6} {run + 1:>3} {result['elapsed']:>7.2f}s {result['throughput']:>8.1f} "
+                          f"{result['p50']:>6.2f}s {result['p95']:>6.2f}s {result['p99']:>6.2f}s "
+                          f"{result['success']:>6} {result['fail']:>5} {result['upstream_requests']:>8} {rss:>7}", flush=True)
+            finally:
+                stop_process(server)
+    finally:
+        stop_process(mock)
+
+    if args.json:
+        json_codec.dump_file({"server": args.server, "server_env": extra_env, "runs": rows}, args.json)
+        print(f"저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
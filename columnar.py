@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/extract_productdata_multi의 columnar 응답 형식 (서버와 호출 스크립트가 함께 사용)
+
+상품마다 같은 키 이름 33개를 반복하지 않도록 키 목록은 한 번만 보내고, 상품은 값 배열(row)로 보냄
+    {
+        "format": "columnar",
+        "fields": ["nvmid", "productTitle", ...],   # row 값의 순서
+        "nvmids": ["...", ...],                     # 요청 순서 (중복 포함)
+        "rows": [[...], null, ...],                 # nvmids와 같은 위치, 실패하거나 상품이 없으면 null
+        "errors": [[index, "에러 메시지"], ...],     # 실패한 위치만
+        "shapes": [[0, 1, 2], ...],                 # fields와 키 구성/순서가 다른 상품의 키 (fields 위치 목록)
+        "row_shapes": [[index, shape 번호], ...]     # 그런 상품이 있는 위치만
+    }
+- 상품에 없는 키도 row에서는 null로 자리를 채우고(column()용), 키 구성은 shapes로 따로 보내서
+  복원한 dict가 원래 상품과 같은 키 / 순서를 가짐 (빈 상품 자리표시자처럼 키가 적은 상품)
+- ColumnarResults: 응답을 기존 results 리스트처럼 쓰되, dict는 접근할 때 만듦
+"""
+
+
+def encode_results(nvmids: list, results: list, fields: list | None = None) -> dict:
+    """
+    fetch 결과 dict 리스트를 columnar 블록으로 변환
+
+    Args:
+        nvmids (list): 요청 nvmid 리스트 (results와 같은 순서)
+        results (list): {nvmid, success, product, error} 리스트
+        fields (list | None): 키 목록. 없으면 상품들에 나온 키를 처음 등장한 순서대로 모음
+
+    Returns:
+        dict: format / fields / nvmids / rows / errors
+    """
+    if not fields:
+        seen = {}
+        for r in results:
+            product = r.get("product") if r else None
+            if product:
+                for key in product:
+                    seen.setdefault(key, None)
+        fields = list(seen)
+
+    rows = []
+    errors = []
+    shapes = {}  # fields 위치 tuple -> shape 번호
+    row_shapes = []
+    full_shape = tuple(range(len(fields)))
+    field_positions = {key: pos for pos, key in enumerate(fields)}
+    row_cache = {}  # 중복 nvmid는 같은 결과 dict를 가리키므로 row / shape도 한 번만 만듦
+    for idx, r in enumerate(results):
+        if not r or not r.get("success"):
+            rows.append(None)
+            errors.append([idx, r.get("error") if r else "결과 없음"])
+            continue
+        product = r.get("product")
+        if product is None:
+            rows.append(None)
+            continue
+        cached = row_cache.get(id(r))
+        if cached is None:
+            shape = tuple(field_positions[key] for key in product if key in field_positions)
+            shape_id = None if shape == full_shape else shapes.setdefault(shape, len(shapes))
+            cached = row_cache[id(r)] = ([product.get(key) for key in fields], shape_id)
+        row, shape_id = cached
+        rows.append(row)
+        if shape_id is not None:
+            row_shapes.append([idx, shape_id])
+
+    return {
+        "format": "columnar",
+        "fields": fields,
+        "nvmids": nvmids,
+        "rows": rows,
+        "errors": errors,
+        "shapes": [list(shape) for shape in shapes],
+        "row_shapes": row_shapes,
+    }
+
+
+class ColumnarResults:
+    """
+    columnar 응답을 results 리스트처럼 읽기 위한 래퍼
+    len / 인덱스 / 반복을 지원하고, {nvmid, success, product, error} dict는 접근하는 시점에 만듦
+    """
+
+    def __init__(self, payload: dict):
+        self.fields = payload["fields"]
+        self.nvmids = payload["nvmids"]
+        self.rows = payload["rows"]
+        self.errors = {idx: error for idx, error in payload.get("errors", [])}
+        shapes = payload.get("shapes") or []
+        self.row_shapes = {idx: shapes[shape_id] for idx, shape_id in payload.get("row_shapes") or []}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, idx: int) -> dict:
+        if idx < 0:
+            idx += len(self.rows)
+        if idx in self.errors:
+            return {"nvmid": self.nvmids[idx], "success": False, "product": None, "error": self.errors[idx]}
+        row = self.rows[idx]
+        shape = self.row_shapes.get(idx)
+        if row is None:
+            product = None
+        elif shape is None:
+            product = dict(zip(self.fields, row))
+        else:
+            product = {self.fields[pos]: row[pos] for pos in shape}
+        return {"nvmid": self.nvmids[idx], "success": True, "product": product, "error": None}
+
+    def __iter__(self):
+        for idx in range(len(self.rows)):
+            yield self[idx]
+
+    def is_success(self, idx: int) -> bool:
+        """dict를 만들지 않고 성공 여부만 확인"""
+        return idx not in self.errors
+
+    def column(self, key: str) -> list:
+        """특정 필드 값만 요청 순서대로 반환 (실패 위치는 None)"""
+        pos = self.fields.index(key)
+        return [row[pos] if row is not None else None for row in self.rows]
+
+
+def decode_results(payload: dict) -> list:
+    """columnar 응답이면 results 리스트(dict)로 풀고, 일반 응답이면 results를 그대로 반환"""
+    if payload.get("format") == "columnar":
+        return list(ColumnarResults(payload))
+    return payload.get("results", [])
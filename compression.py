@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+서버(hello.py)와 호출 스크립트가 함께 쓰는 HTTP 본문 압축 코덱
+- gzip은 표준 라이브러리(zlib)로 항상 지원
+- zstd(zstandard), br(brotli)은 패키지가 설치되어 있을 때만 지원
+- choose_encoding: Accept-Encoding 헤더에서 응답 인코딩 선택 (zstd > br > gzip)
+- compress / decompress: 요청·응답 본문 전체 압축 / 해제 (decompress는 gzip / zstd만, max_size로 해제 후 크기 제한)
+- StreamCompressor: NDJSON 스트리밍 응답용 (줄 단위로 flush해서 클라이언트가 바로 읽을 수 있음)
+"""
+import io
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+# 응답 인코딩 우선순위 (앞쪽이 압축률/속도 모두 유리)
+PREFERRED_ENCODINGS = ("zstd", "br", "gzip")
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+BROTLI_QUALITY = 5
+
+class DecompressedTooLarge(Exception):
+    """해제한 본문이 decompress(max_size=...)의 제한을 넘음"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"압축 해제한 본문이 {max_size} bytes를 넘습니다.")
+        self.max_size = max_size
+
+
+def available_encodings() -> list:
+    """이 환경에서 쓸 수 있는 인코딩 목록 (우선순위 순)"""
+    return [
+        encoding for encoding in PREFERRED_ENCODINGS
+        if encoding == "gzip"
+        or (encoding == "zstd" and zstandard is not None)
+        or (encoding == "br" and brotli is not None)
+    ]
+
+
+def accept_encoding_header() -> str:
+    """호출 스크립트가 보낼 Accept-Encoding 값"""
+    return ", ".join(available_encodings())
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """
+    Accept-Encoding 헤더에서 응답에 쓸 인코딩 선택
+
+    Args:
+        accept_encoding (str | None): 요청의 Accept-Encoding 헤더 값
+
+    Returns:
+        str | None: "zstd" / "br" / "gzip", 압축하지 않으면 None
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in available_encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """본문 전체를 encoding으로 압축"""
+    if encoding == "gzip":
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush()
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    raise ValueError(f"지원하지 않는 Content-Encoding: {encoding}")
+
+
+def decompress(data: bytes, encoding: str | None, max_size: int | None = None) -> bytes:
+    """
+    Content-Encoding에 맞춰 본문 해제 (encoding이 없거나 identity면 그대로)
+    gzip / deflate / zstd만 지원: br은 해제 크기를 확실히 제한할 방법이 없어서 응답 압축에만 사용
+    max_size가 있으면 해제 결과가 그 크기를 넘는 순간 중단 (작은 압축 본문으로 메모리를 채우는 요청 방지)
+
+    Raises:
+        ValueError: 지원하지 않는 인코딩
+        DecompressedTooLarge: 해제 결과가 max_size를 넘음
+        zlib.error 등: 손상된 본문
+    """
+    encoding = (encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return data
+    # 제한보다 1 byte 더 해제해 보고, 그만큼 나오면 제한 초과
+    read_size = -1 if max_size is None else max_size + 1
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        wbits = 16 + zlib.MAX_WBITS if encoding != "deflate" else zlib.MAX_WBITS
+        decompressor = zlib.decompressobj(wbits)
+        body = decompressor.decompress(data, max(read_size, 0))
+        if not decompressor.eof and (max_size is None or len(body) <= max_size):
+            raise zlib.error("incomplete or truncated stream")
+    elif encoding == "zstd" and zstandard is not None:
+        # 프레임 헤더의 원래 크기는 보내는 쪽이 정하므로 믿지 않고, 읽은 만큼만 해제
+        # (스트리밍으로 압축된 프레임은 헤더에 원래 크기가 없어도 그대로 읽힘)
+        with zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)) as reader:
+            body = reader.read(read_size)
+    else:
+        raise ValueError(f"지원하지 않는 Content-Encoding: {encoding}")
+    if max_size is not None and len(body) > max_size:
+        raise DecompressedTooLarge(max_size)
+    return body
+
+
+class StreamCompressor:
+    """
+    스트리밍 응답용 압축기
+    compress(chunk)는 매번 flush된 bytes를 반환해서 각 NDJSON 줄이 바로 클라이언트에 도착함
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == "zstd" and zstandard is not None:
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+        elif encoding == "br" and brotli is not None:
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            raise ValueError(f"지원하지 않는 Content-Encoding: {encoding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "zstd":
+            return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
@@ -1,22 +1,200 @@
 #!/usr/bin/env python3
 """
 Render에 배포되는 Python 엔드포인트: GET / → "hello, world"
-로컬 실행: python hello.py [--serve]
+로컬 실행: python hello.py [--serve] [--server flask|async]
 배포 후 호출: RENDER_SERVICE_ID, RENDER_SERVICE_URL 설정 후 python hello.py --deploy-and-call
 """
 import argparse
 import asyncio
+import atexit
+import concurrent.futures
+import hashlib
+import http.cookiejar
 import json
 import os
+import sqlite3
 import subprocess
 import sys
+import threading
 import time
+import uuid
+from collections import OrderedDict, deque
 import aiohttp
 import requests
 
-from flask import Flask, request, jsonify
+from aiohttp import web
+from flask import Flask, Response, g, request, jsonify
+from flask.json.provider import JSONProvider
+from requests.adapters import HTTPAdapter
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성 (Accept: application/msgpack 응답용)
+    msgpack = None
+
+import columnar
+import compression
+import json_codec
+import metrics
+
+
+class CodecJSONProvider(JSONProvider):
+    """jsonify / request.get_json이 json_codec(orjson 우선, 한글을 \\uXXXX로 이스케이프하지 않음)을 쓰도록 함"""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return json_codec.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return json_codec.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_codec.dumps(obj), mimetype="application/json")
+
 
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
+
+
+# Prometheus 지표 (/metrics, 캐시 / single-flight 등 기존 통계는 collect_metric_families로 함께 출력)
+metrics_registry = metrics.Registry()
+HTTP_REQUEST_SECONDS = metrics_registry.histogram(
+    "http_request_duration_seconds", "route별 요청 처리 시간 (스트리밍 응답은 첫 바이트까지)", ("route", "method", "status"))
+UPSTREAM_REQUEST_SECONDS = metrics_registry.histogram(
+    "upstream_request_duration_seconds", "업스트림 요청 시간 (응답 헤더까지), 상태 코드별 (연결 오류 / 타임아웃은 error)", ("client", "status"))
+UPSTREAM_IN_FLIGHT = metrics_registry.gauge("upstream_in_flight_requests", "진행 중인 업스트림 요청 수", ("client",))
+UPSTREAM_RETRIES = metrics_registry.counter("upstream_retries_total", "재시도 대상(is_retriable_error)이라 다시 큐에 넣은 nvmid 수")
+PRODUCT_BATCH_SECONDS = metrics_registry.histogram(
+    "product_batch_duration_seconds", "multi / job 요청 하나의 전체 조회 시간 (iter_product_results)",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0))
+PRODUCT_BATCH_ITEMS = metrics_registry.counter("product_batch_items_total", "multi / job으로 조회한 nvmid 수 (중복 제거 후)", ("source",))
+
+
+# 공용 이벤트 루프 / aiohttp 세션
+# sync route에서 asyncio.run()을 반복하면 루프, 커넥터, 세션이 매번 새로 만들어져
+# DNS 조회와 TCP/TLS 핸드셰이크가 batch/재시도/요청마다 버려진다.
+# 프로세스 전역 백그라운드 루프 하나가 풀링된 세션을 소유하고, route는 여기에 작업을 제출한다.
+_background_loop = None
+_background_loop_lock = threading.Lock()
+_shared_session = None
+_shared_session_loop = None
+
+# 커넥션 재사용 통계 (aiohttp TraceConfig로 수집, 루프 스레드에서만 갱신)
+_connection_stats = {
+    "requests": 0,
+    "connections_created": 0,
+    "connections_reused": 0,
+    "dns_cache_hits": 0,
+    "dns_cache_misses": 0,
+}
+
+
+def _make_stat_counter(key):
+    async def _count(session, trace_config_ctx, params):
+        _connection_stats[key] += 1
+    return _count
+
+
+async def _on_upstream_request_start(session, trace_config_ctx, params):
+    trace_config_ctx.upstream_started = time.perf_counter()
+    UPSTREAM_IN_FLIGHT.inc(client="aiohttp")
+
+
+def _finish_upstream_request(trace_config_ctx, status):
+    UPSTREAM_IN_FLIGHT.dec(client="aiohttp")
+    UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - trace_config_ctx.upstream_started, client="aiohttp", status=status)
+
+
+async def _on_upstream_request_end(session, trace_config_ctx, params):
+    _finish_upstream_request(trace_config_ctx, params.response.status)
+
+
+async def _on_upstream_request_exception(session, trace_config_ctx, params):
+    _finish_upstream_request(trace_config_ctx, "error")
+
+
+def _create_shared_session() -> aiohttp.ClientSession:
+    max_concurrent = UPSTREAM_MAX_IN_FLIGHT   # 전체 동시 연결 수 (실제 동시 요청 수는 AIMD 제어기가 조절)
+    max_per_host = UPSTREAM_MAX_IN_FLIGHT     # 호스트당 동시 연결 수
+
+    connector = aiohttp.TCPConnector(
+        limit=max_concurrent,
+        limit_per_host=max_per_host,
+        ttl_dns_cache=600,  # DNS 캐시 시간 증가
+        enable_cleanup_closed=True,  # 닫힌 연결 정리 활성화
+        force_close=False,  # 연결 재사용
+        keepalive_timeout=30,  # keep-alive 타임아웃
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=30,
+        connect=10,  # 연결 타임아웃
+        sock_read=10  # 소켓 읽기 타임아웃
+    )
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_make_stat_counter("requests"))
+    trace_config.on_connection_create_end.append(_make_stat_counter("connections_created"))
+    trace_config.on_connection_reuseconn.append(_make_stat_counter("connections_reused"))
+    trace_config.on_dns_cache_hit.append(_make_stat_counter("dns_cache_hits"))
+    trace_config.on_dns_cache_miss.append(_make_stat_counter("dns_cache_misses"))
+    trace_config.on_request_start.append(_on_upstream_request_start)
+    trace_config.on_request_end.append(_on_upstream_request_end)
+    trace_config.on_request_exception.append(_on_upstream_request_exception)
+
+    # 여러 호출자가 세션을 공유하므로 응답 Set-Cookie가 다른 계정 요청에 섞이지 않도록 쿠키 저장 안 함
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        cookie_jar=aiohttp.DummyCookieJar(),
+        trace_configs=[trace_config],
+    )
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """
+    현재 실행 중인 이벤트 루프에 묶인 공용 aiohttp 세션을 반환 (없으면 생성)
+    반드시 이벤트 루프 안(코루틴)에서 호출해야 함
+    """
+    global _shared_session, _shared_session_loop
+    loop = asyncio.get_running_loop()
+    if _shared_session is None or _shared_session.closed or _shared_session_loop is not loop:
+        _shared_session = _create_shared_session()
+        _shared_session_loop = loop
+    return _shared_session
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """프로세스 전역 백그라운드 이벤트 루프 반환 (첫 호출 시 데몬 스레드에서 시작)"""
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None or _background_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="upstream-loop", daemon=True)
+            thread.start()
+            _background_loop = loop
+    return _background_loop
+
+
+def run_in_background_loop(coro, timeout=None):
+    """sync 코드에서 코루틴을 백그라운드 루프에 제출하고 결과를 기다림"""
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop()).result(timeout)
+
+
+def get_connection_stats() -> dict:
+    """공용 세션의 커넥션 재사용 통계"""
+    stats = dict(_connection_stats)
+    opened = stats["connections_created"] + stats["connections_reused"]
+    stats["reuse_ratio"] = round(stats["connections_reused"] / opened, 4) if opened else 0.0
+    return stats
+
+
+@atexit.register
+def _close_shared_session():
+    if _shared_session is not None and not _shared_session.closed and _shared_session_loop is _background_loop:
+        try:
+            run_in_background_loop(_shared_session.close(), timeout=5)
+        except Exception:
+            pass
 
 
 @app.route("/")
@@ -29,14 +207,605 @@ def health():
     return {"status": "ok"}, 200
 
 
+def collect_stats() -> dict:
+    """/stats 응답 (커넥션 재사용, 동시 요청 제어, 요청 수 제한, 캐시, 동기 호출 세션 풀)"""
+    return {
+        "upstream_connections": get_connection_stats(),
+        "concurrency": _concurrency_controller.snapshot(),
+        "rate_limit": get_rate_limiter_stats(),
+        "cache": product_cache.stats(),
+        "disk_cache": disk_cache.stats() if disk_cache is not None else {"enabled": False},
+        "single_flight": product_flight.stats(),
+        "sync_sessions": upstream_session_pool.stats(),
+    }
+
+
+@app.route("/stats")
+def stats():
+    return jsonify(collect_stats()), 200
+
+
+def collect_metric_families() -> list:
+    """/metrics에 함께 내보낼 기존 통계 (캐시, single-flight, 동시 요청 상한, 세션 풀)"""
+    memory = product_cache.stats()
+    disk = disk_cache.stats() if disk_cache is not None else None
+    hits = [({"tier": "memory"}, memory["hits"])]
+    misses = [({"tier": "memory"}, memory["misses"])]
+    if disk is not None:
+        hits.append(({"tier": "disk"}, disk["hits"]))
+        misses.append(({"tier": "disk"}, disk["misses"]))
+    flight = product_flight.stats()
+    sync_sessions = upstream_session_pool.stats()
+    connections = get_connection_stats()
+    return [
+        ("product_cache_hits_total", "counter", "상품 캐시 적중 수", hits),
+        ("product_cache_misses_total", "counter", "상품 캐시 미적중 수", misses),
+        ("product_cache_entries", "gauge", "메모리 캐시 항목 수", [({}, memory["entries"])]),
+        ("single_flight_coalesced_total", "counter", "진행 중인 같은 요청에 합쳐진 호출 수", [({}, flight["coalesced"])]),
+        ("upstream_concurrency_limit", "gauge", "AIMD 동시 요청 상한", [({}, _concurrency_controller.limit)]),
+        ("upstream_concurrency_in_flight", "gauge", "AIMD 상한을 적용받는 진행 중인 업스트림 요청 수 (프로세스 전체)",
+         [({}, _concurrency_controller.in_flight)]),
+        ("upstream_connections_created_total", "counter", "새로 연 업스트림 연결 수",
+         [({"client": "aiohttp"}, connections["connections_created"]), ({"client": "requests"}, sync_sessions["connections_created"])]),
+    ]
+
+
+metrics_registry.add_collector(collect_metric_families)
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics_registry.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response):
+    started = g.get("request_started")
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, method=request.method, status=response.status_code)
+    return response
+
+
+# 업스트림 주소 (부하 테스트 때는 UPSTREAM_BASE_URL=http://127.0.0.1:18080 처럼 mock_upstream.py로 지정)
+UPSTREAM_BASE_URL = os.environ.get("UPSTREAM_BASE_URL", "https://sell.smartstore.naver.com").rstrip("/")
+PRODUCT_API_URL = f"{UPSTREAM_BASE_URL}/api/product/shared/product-search-popular"
+
+# 클라이언트가 헤더를 보내지 않았을 때 사용하는 기본 헤더
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Referer": "https://sell.smartstore.naver.com/",
+}
+
+
+def resolve_headers(client_headers) -> dict:
+    """클라이언트에서 받은 헤더 사용, 없으면 기본 헤더"""
+    return client_headers if isinstance(client_headers, dict) and client_headers else dict(DEFAULT_HEADERS)
+
+
+def parse_cookie_string(cookies) -> dict:
+    """쿠키 문자열("k=v; k2=v2")을 딕셔너리로 변환"""
+    cookie_dict = {}
+    if isinstance(cookies, str):
+        for item in cookies.split(";"):
+            if "=" in item:
+                key, value = item.strip().split("=", 1)
+                cookie_dict[key] = value
+    return cookie_dict
+
+
+def parse_product_result(result) -> dict | None:
+    """
+    인기상품 API 응답(JSON)에서 상품 dict를 꺼내고 openDateFormatted를 붙여 반환
+
+    Returns:
+        dict or None: 상품 정보 (result가 없거나 dict가 아니면 None)
+    """
+    if not (result and isinstance(result, dict) and "result" in result):
+        return None
+    product_data = result["result"]
+    if not isinstance(product_data, dict):
+        return None
+
+    product_data["openDateFormatted"] = format_open_date(product_data.get("openDate"))
+    return product_data
+
+
+def format_open_date(od):
+    """openDate("2020-04-24T08:33:45.000+00:00") → openDateFormatted("2020-04-24 08:33:45.000")"""
+    if isinstance(od, str) and "T" in od:
+        return od.replace("T", " ").split("+")[0]
+    return od if od else ""
+
+
+def parse_product_result_raw(body: bytes) -> dict | None:
+    """
+    raw 모드: 업스트림 응답 bytes에서 "result" 객체 원문만 잘라내고 openDateFormatted는 정규식으로 계산
+    (전체 JSON 디코딩 / 재인코딩 없음)
+
+    Returns:
+        dict or None: {"product_raw": bytes, "openDateFormatted": str}, result 객체를 찾지 못하면 None
+    """
+    span = json_codec.value_span(body, "result")
+    if span is None or body[span[0]:span[0] + 1] != b"{":
+        return None
+    product_raw = body[span[0]:span[1]]
+    return {"product_raw": product_raw, "openDateFormatted": format_open_date(json_codec.find_scalar(product_raw, "openDate"))}
+
+
+def raw_result_bytes(r: dict) -> bytes:
+    """
+    raw 모드 결과 하나를 JSON bytes로 직렬화
+    상품 원문(product_raw)은 그대로 이어 붙이고, openDateFormatted는 product 옆 필드로 붙임
+    """
+    if "product_raw" in r:
+        return (b'{"nvmid":' + json_codec.dumps(r["nvmid"]) + b',"success":true,"product":' + r["product_raw"]
+                + b',"openDateFormatted":' + json_codec.dumps(r["openDateFormatted"]) + b',"error":null}')
+    product = r.get("product")
+    if product is not None and "openDateFormatted" in product:
+        # 캐시에서 온 결과도 raw 결과와 같은 위치에 openDateFormatted를 둠
+        r = {**r, "openDateFormatted": product["openDateFormatted"]}
+    return json_codec.dumps(r)
+
+
+class ProductCache:
+    """
+    nvmid -> 파싱된 상품 dict 메모리 캐시 (스레드 안전)
+    - ttl초가 지난 항목은 무효, 요청별 max_age로 더 짧게 제한 가능
+    - 항목 수(max_entries) 또는 추정 크기(max_bytes)를 넘으면 가장 오래 안 쓴 항목부터 제거 (LRU)
+    ttl이 0 이하이면 캐시 사용 안 함
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # nvmid -> (product, fetched_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _estimate_size(product: dict) -> int:
+        size = 64
+        for key, value in product.items():
+            size += len(key) + (len(value) if isinstance(value, str) else 8)
+        return size
+
+    def get(self, nvmid, max_age=None) -> dict | None:
+        """max_age초(없으면 ttl) 이내에 저장된 상품 반환, 없으면 None"""
+        if not self.enabled:
+            return None
+        limit = self.ttl if max_age is None else min(self.ttl, max_age)
+        key = str(nvmid)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[1] > limit:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, nvmid, product: dict, fetched_at: float | None = None):
+        if not self.enabled:
+            return
+        key = str(nvmid)
+        size = self._estimate_size(product)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (product, fetched_at or time.time(), size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "ttl": self.ttl,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# 상품 캐시 설정 (PRODUCT_CACHE_TTL=0 이면 캐시 끔)
+PRODUCT_CACHE_TTL = float(os.environ.get("PRODUCT_CACHE_TTL", 600))
+PRODUCT_CACHE_MAX_ENTRIES = int(os.environ.get("PRODUCT_CACHE_MAX_ENTRIES", 50000))
+PRODUCT_CACHE_MAX_BYTES = int(os.environ.get("PRODUCT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+product_cache = ProductCache(PRODUCT_CACHE_TTL, PRODUCT_CACHE_MAX_ENTRIES, PRODUCT_CACHE_MAX_BYTES)
+
+
+class DiskProductCache:
+    """
+    SQLite 기반 상품 캐시 (여러 gunicorn worker / 재시작 간 공유)
+    - products(nvmid, product JSON, fetched_at) 테이블에 저장, WAL 모드로 여러 프로세스 동시 접근
+    - 쓰기는 버퍼에 모았다가 백그라운드 스레드가 flush_interval마다 한 번에 기록
+    - 같은 스레드가 retention초보다 오래된 행을 주기적으로 삭제
+    - 조회는 nvmid 목록 단위로 묶어서 (get_many)
+    """
+
+    _LOOKUP_CHUNK = 500  # SQLite 변수 개수 제한 대응
+
+    def __init__(self, path: str, ttl: float, retention: float, flush_interval: float = 1.0, expire_interval: float = 300.0):
+        self.path = path
+        self.ttl = ttl
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self.expire_interval = expire_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            "nvmid TEXT PRIMARY KEY, product TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_products_fetched_at ON products(fetched_at)")
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+        self._pending = {}  # nvmid -> (product JSON, fetched_at), 아직 기록 안 된 쓰기
+        self._pending_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.expired = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._background, name="disk-cache", daemon=True)
+        self._thread.start()
+
+    def get_many(self, nvmids, max_age=None) -> dict:
+        """
+        nvmid 목록 중 ttl 이내에 저장된 상품 반환: {nvmid: (product, fetched_at)}
+        max_age는 기준을 더 엄격하게만 함 (ProductCache.get과 같이 min(ttl, max_age))
+        """
+        limit = self.ttl if max_age is None else min(self.ttl, max_age)
+        oldest = time.time() - limit
+        keys = list(dict.fromkeys(str(nvmid) for nvmid in nvmids))
+        found = {}
+        with self._pending_lock:
+            for key in keys:
+                pending = self._pending.get(key)
+                if pending is not None and pending[1] >= oldest:
+                    found[key] = (json_codec.loads(pending[0]), pending[1])
+        remaining = [key for key in keys if key not in found]
+        with self._db_lock:
+            for i in range(0, len(remaining), self._LOOKUP_CHUNK):
+                chunk = remaining[i:i + self._LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT nvmid, product, fetched_at FROM products "
+                    f"WHERE fetched_at >= ? AND nvmid IN ({','.join('?' * len(chunk))})",
+                    [oldest, *chunk],
+                ).fetchall()
+                for key, product_json, fetched_at in rows:
+                    found[key] = (json_codec.loads(product_json), fetched_at)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, nvmid, product: dict, fetched_at: float | None = None):
+        """쓰기 버퍼에 추가 (백그라운드 스레드가 기록)"""
+        with self._pending_lock:
+            self._pending[str(nvmid)] = (json_codec.dumps(product), fetched_at or time.time())
+
+    def flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO products (nvmid, product, fetched_at) VALUES (?, ?, ?)",
+                [(key, product_json, fetched_at) for key, (product_json, fetched_at) in pending.items()],
+            )
+            self._conn.commit()
+        self.writes += len(pending)
+
+    def expire(self):
+        with self._db_lock:
+            cursor = self._conn.execute("DELETE FROM products WHERE fetched_at < ?", (time.time() - self.retention,))
+            self._conn.commit()
+        self.expired += cursor.rowcount
+
+    def _background(self):
+        last_expire = 0.0
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                if time.monotonic() - last_expire >= self.expire_interval:
+                    self.expire()
+                    last_expire = time.monotonic()
+            except sqlite3.Error as e:
+                print(f"[disk-cache] {e}", file=sys.stderr)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._db_lock:
+            rows = self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "path": self.path,
+            "ttl": self.ttl,
+            "retention": self.retention,
+            "rows": rows,
+            "pending_writes": len(self._pending),
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "expired": self.expired,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 디스크 캐시 설정 (PRODUCT_CACHE_DB 경로를 지정해야 사용)
+PRODUCT_CACHE_DB = os.environ.get("PRODUCT_CACHE_DB", "")
+PRODUCT_CACHE_DB_TTL = float(os.environ.get("PRODUCT_CACHE_DB_TTL", 3600))
+PRODUCT_CACHE_DB_RETENTION = float(os.environ.get("PRODUCT_CACHE_DB_RETENTION", 7 * 24 * 3600))
+disk_cache = DiskProductCache(PRODUCT_CACHE_DB, PRODUCT_CACHE_DB_TTL, PRODUCT_CACHE_DB_RETENTION) if PRODUCT_CACHE_DB else None
+
+
+@atexit.register
+def _close_disk_cache():
+    if disk_cache is not None:
+        disk_cache.close()
+
+
+def store_product(nvmid, product: dict):
+    """업스트림에서 받은 상품을 메모리 캐시와 디스크 캐시(설정된 경우)에 저장"""
+    fetched_at = time.time()
+    product_cache.put(nvmid, product, fetched_at)
+    if disk_cache is not None:
+        disk_cache.put(nvmid, product, fetched_at)
+
+
+def lookup_products(nvmids, max_age=None) -> dict:
+    """
+    nvmid 목록을 메모리 캐시 → 디스크 캐시 순으로 한꺼번에 조회: {nvmid: product}
+    디스크에서 찾은 항목은 메모리 캐시로 올림
+    """
+    found = {}
+    for nvmid in nvmids:
+        product = product_cache.get(nvmid, max_age)
+        if product is not None:
+            found[nvmid] = product
+    if disk_cache is not None:
+        missing = [nvmid for nvmid in nvmids if nvmid not in found]
+        if missing:
+            from_disk = disk_cache.get_many(missing, max_age)
+            for nvmid in missing:
+                entry = from_disk.get(str(nvmid))
+                if entry is not None:
+                    found[nvmid] = entry[0]
+                    product_cache.put(nvmid, entry[0], entry[1])
+    return found
+
+
+def cache_options(data: dict) -> tuple[float | None, bool]:
+    """
+    요청 body의 캐시 옵션 반환: (max_age, use_cache)
+    - "max_age": 이 초보다 오래된 캐시는 쓰지 않음
+    - "no_cache": true 이면 캐시 조회 없이 업스트림 호출 (결과는 캐시에 저장)
+    """
+    max_age = data.get("max_age")
+    if isinstance(max_age, bool) or not isinstance(max_age, (int, float)):
+        max_age = None
+    return max_age, not data.get("no_cache")
+
+
+def cached_result(nvmid, product: dict) -> dict:
+    """캐시된 상품을 fetch 함수와 같은 형태의 결과 dict로 변환"""
+    return {"nvmid": nvmid, "success": True, "product": product, "error": None}
+
+
+def validate_fields(data: dict) -> tuple[dict, int] | None:
+    """요청 body의 "fields"(상품에서 남길 키 목록) 검증"""
+    fields = data.get("fields")
+    if fields is not None and not (isinstance(fields, list) and all(isinstance(f, str) for f in fields)):
+        return {"success": False, "error": "fields는 문자열 리스트여야 합니다."}, 400
+    return None
+
+
+# 요청/응답 본문 압축 (gzip 기본, zstandard / brotli 패키지가 있으면 zstd / br도 지원)
+# 이보다 작은 응답은 압축 이득보다 오버헤드가 커서 그대로 보냄
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 1024))
+# 압축된 요청 본문을 해제했을 때 허용하는 최대 크기 (넘으면 413)
+MAX_DECOMPRESSED_BYTES = int(os.environ.get("MAX_DECOMPRESSED_BYTES", 32 * 1024 * 1024))
+
+
+def decode_request_json(raw: bytes, content_encoding: str | None) -> tuple[object, tuple[dict, int] | None]:
+    """
+    요청 본문을 Content-Encoding(gzip / zstd 등)에 맞춰 해제한 뒤 JSON 파싱
+    해제 결과는 MAX_DECOMPRESSED_BYTES까지만 허용 (넘으면 413)
+
+    Returns:
+        tuple: (파싱된 body, None) 또는 (None, (에러 응답, 상태 코드))
+    """
+    try:
+        body = compression.decompress(raw, content_encoding, MAX_DECOMPRESSED_BYTES)
+    except compression.DecompressedTooLarge as e:
+        return None, ({"success": False, "error": str(e)}, 413)
+    except ValueError as e:
+        return None, ({"success": False, "error": str(e)}, 415)
+    except Exception:
+        return None, ({"success": False, "error": "압축된 요청 본문을 해제할 수 없습니다."}, 400)
+    return json_codec.loads(body), None
+
+
+def encode_response_body(body: bytes, accept_encoding: str | None) -> tuple[bytes, dict]:
+    """
+    Accept-Encoding에 맞춰 응답 본문 압축
+
+    Returns:
+        tuple: (본문 bytes, 추가할 응답 헤더)
+    """
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    encoding = compression.choose_encoding(accept_encoding) if len(body) >= COMPRESS_MIN_BYTES else None
+    if encoding:
+        body = compression.compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return body, headers
+
+
+def compress_chunks(chunks, encoding: str):
+    """스트리밍 응답의 각 chunk를 압축 (chunk마다 flush해서 줄 단위로 바로 전송됨)"""
+    compressor = compression.StreamCompressor(encoding)
+    for chunk in chunks:
+        yield compressor.compress(chunk)
+    yield compressor.finish()
+
+
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def serialize_payload(payload, accept: str | None) -> tuple[bytes, str]:
+    """
+    Accept 헤더에 맞춰 응답 payload 직렬화
+    "Accept: application/msgpack"이고 msgpack이 설치되어 있으면 MessagePack (nvmid, lowPrice 등 정수는 그대로 정수),
+    아니면 JSON
+
+    Returns:
+        tuple: (본문 bytes, Content-Type)
+    """
+    if msgpack is not None and any(mimetype in (accept or "") for mimetype in MSGPACK_MIMETYPES):
+        return msgpack.packb(payload, use_bin_type=True), "application/msgpack"
+    return json_codec.dumps(payload), "application/json"
+
+
+class RequestTiming:
+    """
+    상품 요청 하나의 단계별 소요 시간 (Server-Timing 헤더, body에 "timing": true이면 응답의 timing 블록)
+    - parse: 요청 본문 해제 + JSON 파싱 + 검증
+    - queue: nvmid가 동시 요청 상한 때문에 큐에서 기다린 시간 (합계 / 최대)
+    - upstream: 업스트림 응답 대기 시간 (합계 / 최대, 동시에 진행된 요청은 겹친 시간도 각각 더함)
+    - rate_wait: 초당 요청 수 제한(토큰 버킷) 때문에 새 요청을 보내지 못한 시간
+    - retry_rounds: 재시도 대상이라 다시 큐에 넣은 횟수
+    - serialize: 응답 직렬화 + 압축 (body가 만들어진 뒤라서 Server-Timing 헤더에만 들어감)
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.parse = 0.0
+        self.queue_sum = 0.0
+        self.queue_max = 0.0
+        self.upstream_sum = 0.0
+        self.upstream_max = 0.0
+        self.upstream_count = 0
+        self.rate_wait = 0.0
+        self.retry_rounds = 0
+        self.serialize = 0.0
+
+    def mark_parsed(self):
+        self.parse = time.perf_counter() - self.started
+
+    def add_queue(self, seconds: float):
+        self.queue_sum += seconds
+        self.queue_max = max(self.queue_max, seconds)
+
+    def add_upstream(self, seconds: float):
+        self.upstream_sum += seconds
+        self.upstream_max = max(self.upstream_max, seconds)
+        self.upstream_count += 1
+
+    def as_dict(self) -> dict:
+        """응답 body의 timing 블록 (ms)"""
+        return {
+            "parse_ms": round(self.parse * 1000, 2),
+            "queue_ms": round(self.queue_sum * 1000, 2),
+            "queue_max_ms": round(self.queue_max * 1000, 2),
+            "upstream_ms": round(self.upstream_sum * 1000, 2),
+            "upstream_max_ms": round(self.upstream_max * 1000, 2),
+            "upstream_requests": self.upstream_count,
+            "rate_wait_ms": round(self.rate_wait * 1000, 2),
+            "retry_rounds": self.retry_rounds,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+        }
+
+    def header(self, parse_only: bool = False) -> str:
+        """Server-Timing 헤더 값 (스트리밍 응답은 본문보다 먼저 나가므로 parse_only)"""
+        entries = [f"parse;dur={self.parse * 1000:.2f}"]
+        if not parse_only:
+            entries += [
+                f'queue;dur={self.queue_sum * 1000:.2f};desc="sum"',
+                f"queue-max;dur={self.queue_max * 1000:.2f}",
+                f'upstream;dur={self.upstream_sum * 1000:.2f};desc="sum of {self.upstream_count}"',
+                f"upstream-max;dur={self.upstream_max * 1000:.2f}",
+                f"rate-wait;dur={self.rate_wait * 1000:.2f}",
+                f'retry;desc="{self.retry_rounds} rounds"',
+                f"serialize;dur={self.serialize * 1000:.2f}",
+                f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}",
+            ]
+        return ", ".join(entries)
+
+
+def encoded_response(payload, status: int = 200, timing: RequestTiming | None = None) -> Response:
+    """
+    Flask용: Accept(JSON / MessagePack)로 직렬화하고 Accept-Encoding에 맞춰 압축한 응답
+    timing이 있으면 직렬화 시간을 더해 Server-Timing 헤더 추가
+    """
+    serialize_started = time.perf_counter()
+    body, mimetype = serialize_payload(payload, request.headers.get("Accept"))
+    body, headers = encode_response_body(body, request.headers.get("Accept-Encoding"))
+    if timing is not None:
+        timing.serialize = time.perf_counter() - serialize_started
+        headers["Server-Timing"] = timing.header()
+    return Response(body, status=status, headers=headers, mimetype=mimetype)
+
+
+def project_product(product: dict, fields: list | None) -> dict:
+    """fields가 있으면 상품 dict에서 해당 키만 남긴 새 dict 반환 (캐시된 원본은 그대로)"""
+    if not fields or product is None:
+        return product
+    return {key: product[key] for key in fields if key in product}
+
+
+def project_result(r: dict, fields: list | None) -> dict:
+    """fetch 결과 dict의 product에 필드 선택 적용"""
+    if not fields or r.get("product") is None:
+        return r
+    return {**r, "product": project_product(r["product"], fields)}
+
+
 @app.route("/extract_productdata", methods=["POST"])
 def extract_productdata():
     """
     nvmid, cookies, headers를 받아서 상품 정보를 추출하는 엔드포인트
-    Request Body: { "nvmid": "string", "cookies": "string", "headers": "dict" }
+    Request Body: { "nvmid": "string", "cookies": "string", "headers": "dict",
+                    "max_age": 초(선택), "no_cache": bool(선택), "fields": ["productTitle", ...](선택) }
+    "Accept: application/msgpack"이면 MessagePack으로 반환 (msgpack 설치 시)
+    단계별 소요 시간은 Server-Timing 헤더로, "timing": true이면 body의 timing으로도 반환 (RequestTiming)
     """
     try:
-        data = request.get_json()
+        timing = RequestTiming()
+        data, error = decode_request_json(request.get_data(), request.headers.get("Content-Encoding"))
+        if error:
+            return jsonify(error[0]), error[1]
         if not data:
             return jsonify({"success": False, "error": "JSON body가 필요합니다."}), 400
 
@@ -48,69 +817,28 @@ def extract_productdata():
             return jsonify({"success": False, "error": "nvmid가 필요합니다."}), 400
         if not cookies:
             return jsonify({"success": False, "error": "cookies가 필요합니다."}), 400
+        error = validate_fields(data)
+        if error:
+            return jsonify(error[0]), error[1]
+        fields = data.get("fields")
+        timing.mark_parsed()
+
+        max_age, use_cache = cache_options(data)
+        cached = lookup_products([nvmid], max_age).get(nvmid) if use_cache else None
+        if cached is not None:
+            payload = {"success": True, "products": [project_product(cached, fields)], "nvmid": nvmid}
+            if data.get("timing"):
+                payload["timing"] = timing.as_dict()
+            return encoded_response(payload, timing=timing)
 
         # 스마트스토어 인기상품 API 호출 (z_extract_productdata.py와 동일)
-        url = "https://sell.smartstore.naver.com/api/product/shared/product-search-popular"
-        params = {
-            "_action": "productSearchPopularByCategory",
-            "nvMid": nvmid
-        }
-
-        # 쿠키 문자열을 딕셔너리로 변환
-        cookie_dict = {}
-        if isinstance(cookies, str):
-            for item in cookies.split(";"):
-                if "=" in item:
-                    key, value = item.strip().split("=", 1)
-                    cookie_dict[key] = value
-
-        # 헤더 설정 (클라이언트에서 받은 헤더 사용, 없으면 기본 헤더)
-        headers = client_headers if isinstance(client_headers, dict) and client_headers else {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Referer": "https://sell.smartstore.naver.com/",
-        }
-
-        # API 요청
-        response = requests.get(url, headers=headers, cookies=cookie_dict, params=params, timeout=10)
-
-        if response.status_code != 200:
-            return jsonify({
-                "success": False,
-                "error": f"API 요청 실패: 상태 코드 {response.status_code}"
-            }), 500
-
-        result = response.json()
-
-        # 결과 파싱
-        products = []
-        if result and isinstance(result, dict) and "result" in result:
-            product_data = result["result"]
-            if isinstance(product_data, dict):
-                # 날짜 포맷팅
-                od = product_data.get("openDate")
-                if isinstance(od, str) and "T" in od:
-                    try:
-                        product_data["openDateFormatted"] = od.replace("T", " ").split("+")[0]
-                    except Exception:
-                        product_data["openDateFormatted"] = od
-                else:
-                    product_data["openDateFormatted"] = od if od else ""
-
-                products = [product_data]
-
-        if not products:
-            return jsonify({
-                "success": False,
-                "error": "결과를 찾을 수 없습니다."
-            }), 404
-
-        return jsonify({
-            "success": True,
-            "products": products,
-            "nvmid": nvmid,
-        }), 200
+        # 같은 nvmid 단건 요청이 이미 진행 중이면 새로 호출하지 않고 그 결과를 함께 사용 (single-flight)
+        headers = resolve_headers(client_headers)
+        result = product_flight.run(("single", str(nvmid)), lambda: fetch_single_product(nvmid, cookies, headers, timing))
+        payload, status = single_response(nvmid, project_result(result, fields))
+        if data.get("timing"):
+            payload["timing"] = timing.as_dict()
+        return encoded_response(payload, status, timing)
 
     except Exception as e:
         return jsonify({
@@ -119,21 +847,44 @@ def extract_productdata():
         }), 500
 
 
-async def fetch_single_product_async(session: aiohttp.ClientSession, nvmid: str, cookie_string: str, headers: dict) -> dict:
+def single_response(nvmid, result: dict) -> tuple[dict, int]:
+    """fetch 결과 dict를 /extract_productdata 응답 (body, 상태 코드)으로 변환"""
+    if result["success"]:
+        return {"success": True, "products": [result["product"]], "nvmid": nvmid}, 200
+    error = result.get("error") or ""
+    return {"success": False, "error": error}, 404 if error == "결과를 찾을 수 없습니다." else 500
+
+
+async def fetch_single_product_async(session: aiohttp.ClientSession, nvmid: str, cookie_string: str, headers: dict,
+                                     empty_as_success: bool = True, raw: bool = False) -> dict:
     """
     단일 상품 정보를 가져오는 비동기 함수
+    (초당 요청 수 제한은 호출하는 쪽에서 get_rate_limiter로 적용)
 
     Args:
         session (aiohttp.ClientSession): aiohttp 세션
         nvmid (str): 상품 NVM ID
         cookie_string (str): 쿠키 문자열 (그대로 헤더에 사용)
         headers (dict): 헤더 딕셔너리
+        empty_as_success (bool): 빈 응답/결과 없음을 빈 product 성공으로 처리 (False면
+            fetch_single_product처럼 "결과를 찾을 수 없습니다." / "서버 오류: ..." 실패로 반환)
+        raw (bool): 성공 시 product 대신 업스트림 result 원문(product_raw)과 openDateFormatted 반환
+            (파싱하지 않으므로 캐시에 저장하지 않음, raw_result_bytes로 직렬화)
 
     Returns:
         dict: {nvmid: str, success: bool, product: dict or None, error: str or None}
     """
+    empty_product = {
+        "nvmid": nvmid,
+        "success": True,
+        "product": {
+            "productTitle": "",
+            "mallName": "",
+            "openDateFormatted": ""
+        },
+        "error": None
+    }
     try:
-        url = "https://sell.smartstore.naver.com/api/product/shared/product-search-popular"
         params = {
             "_action": "productSearchPopularByCategory",
             "nvMid": nvmid
@@ -144,7 +895,7 @@ async def fetch_single_product_async(session: aiohttp.ClientSession, nvmid: str,
         request_headers["Cookie"] = cookie_string
 
         # API 요청 (비동기)
-        async with session.get(url, headers=request_headers, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+        async with session.get(PRODUCT_API_URL, headers=request_headers, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
             if response.status != 200:
                 return {
                     "nvmid": nvmid,
@@ -153,70 +904,48 @@ async def fetch_single_product_async(session: aiohttp.ClientSession, nvmid: str,
                     "error": f"API 요청 실패: 상태 코드 {response.status}"
                 }
 
-            # 텍스트로 먼저 읽기 (JSON 파싱 에러 대응)
-            text = await response.text()
+            # bytes 그대로 읽어서 파싱 (str 디코딩 생략)
+            body = await response.read()
 
             # 빈 응답이거나 JSON이 아닌 경우 빈 product로 성공 처리
-            if not text or text.strip() == "":
-                return {
-                    "nvmid": nvmid,
-                    "success": True,
-                    "product": {
-                        "productTitle": "",
-                        "mallName": "",
-                        "openDateFormatted": ""
-                    },
-                    "error": None
-                }
+            if empty_as_success and not body.strip():
+                return empty_product
+
+            if raw:
+                raw_product = parse_product_result_raw(body)
+                if raw_product is not None:
+                    return {"nvmid": nvmid, "success": True, **raw_product, "error": None}
+                # result 객체를 못 찾으면 아래 일반 파싱 경로로 빈 응답 / 결과 없음 처리
 
             # JSON 파싱 시도
             try:
-                result = json.loads(text)
-            except (json.JSONDecodeError, ValueError):
+                result = json_codec.loads(body)
+            except (json_codec.JSONDecodeError, ValueError):
                 # JSON 파싱 실패해도 200 응답이면 성공 처리 (빈 product)
+                if not empty_as_success:
+                    raise
+                return empty_product
+
+            # 결과 파싱
+            product_data = parse_product_result(result)
+            if product_data is not None:
+                store_product(nvmid, product_data)
                 return {
                     "nvmid": nvmid,
                     "success": True,
-                    "product": {
-                        "productTitle": "",
-                        "mallName": "",
-                        "openDateFormatted": ""
-                    },
+                    "product": product_data,
                     "error": None
                 }
 
-            # 결과 파싱
-            if result and isinstance(result, dict) and "result" in result:
-                product_data = result["result"]
-                if isinstance(product_data, dict):
-                    # 날짜 포맷팅
-                    od = product_data.get("openDate")
-                    if isinstance(od, str) and "T" in od:
-                        try:
-                            product_data["openDateFormatted"] = od.replace("T", " ").split("+")[0]
-                        except Exception:
-                            product_data["openDateFormatted"] = od
-                    else:
-                        product_data["openDateFormatted"] = od if od else ""
-
-                    return {
-                        "nvmid": nvmid,
-                        "success": True,
-                        "product": product_data,
-                        "error": None
-                    }
-
             # 결과가 없어도 성공 처리 (빈 product)
-            return {
-                "nvmid": nvmid,
-                "success": True,
-                "product": {
-                    "productTitle": "",
-                    "mallName": "",
-                    "openDateFormatted": ""
-                },
-                "error": None
-            }
+            if not empty_as_success:
+                return {
+                    "nvmid": nvmid,
+                    "success": False,
+                    "product": None,
+                    "error": "결과를 찾을 수 없습니다."
+                }
+            return empty_product
 
     except Exception as e:
         return {
@@ -239,15 +968,41 @@ def fetch_single_product_with_dict(nvmid: str, cookie_dict: dict, headers: dict)
     Returns:
         dict: {nvmid: str, success: bool, product: dict or None, error: str or None}
     """
+    return _fetch_single_product_pooled(nvmid, cookie_dict, headers)
+
+
+def _fetch_single_product_pooled(nvmid: str, cookies, headers: dict, timing: RequestTiming | None = None) -> dict:
+    """
+    fetch_single_product / fetch_single_product_with_dict 공용 구현
+    쿠키 식별자별 keep-alive 세션(upstream_session_pool)으로 요청하고, 쿠키는 Cookie 헤더로 직접 보냄
+    (문자열 쿠키는 파싱하지 않고 그대로 사용)
+    timing이 있으면 요청 수 제한 대기 / 업스트림 대기 시간을 기록
+    """
+    timing = timing or RequestTiming()
     try:
-        url = "https://sell.smartstore.naver.com/api/product/shared/product-search-popular"
         params = {
             "_action": "productSearchPopularByCategory",
             "nvMid": nvmid
         }
-
-        # API 요청
-        response = requests.get(url, headers=headers, cookies=cookie_dict, params=params, timeout=10)
+        request_headers = dict(headers)
+        request_headers["Cookie"] = cookies if isinstance(cookies, str) else "; ".join(f"{k}={v}" for k, v in cookies.items())
+
+        # API 요청 (계정별 초당 요청 수 제한)
+        wait_started = time.perf_counter()
+        get_rate_limiter(cookies).acquire()
+        timing.rate_wait += time.perf_counter() - wait_started
+        session = upstream_session_pool.get(cookies)
+        UPSTREAM_IN_FLIGHT.inc(client="requests")
+        upstream_started = time.perf_counter()
+        upstream_status = "error"
+        try:
+            response = session.get(PRODUCT_API_URL, headers=request_headers, params=params, timeout=10)
+            upstream_status = response.status_code
+        finally:
+            upstream_elapsed = time.perf_counter() - upstream_started
+            timing.add_upstream(upstream_elapsed)
+            UPSTREAM_IN_FLIGHT.dec(client="requests")
+            UPSTREAM_REQUEST_SECONDS.observe(upstream_elapsed, client="requests", status=upstream_status)
 
         if response.status_code != 200:
             return {
@@ -257,28 +1012,16 @@ def fetch_single_product_with_dict(nvmid: str, cookie_dict: dict, headers: dict)
                 "error": f"API 요청 실패: 상태 코드 {response.status_code}"
             }
 
-        result = response.json()
-
         # 결과 파싱
-        if result and isinstance(result, dict) and "result" in result:
-            product_data = result["result"]
-            if isinstance(product_data, dict):
-                # 날짜 포맷팅
-                od = product_data.get("openDate")
-                if isinstance(od, str) and "T" in od:
-                    try:
-                        product_data["openDateFormatted"] = od.replace("T", " ").split("+")[0]
-                    except Exception:
-                        product_data["openDateFormatted"] = od
-                else:
-                    product_data["openDateFormatted"] = od if od else ""
-
-                return {
-                    "nvmid": nvmid,
-                    "success": True,
-                    "product": product_data,
-                    "error": None
-                }
+        product_data = parse_product_result(json_codec.loads(response.content))
+        if product_data is not None:
+            store_product(nvmid, product_data)
+            return {
+                "nvmid": nvmid,
+                "success": True,
+                "product": product_data,
+                "error": None
+            }
 
         return {
             "nvmid": nvmid,
@@ -296,7 +1039,7 @@ def fetch_single_product_with_dict(nvmid: str, cookie_dict: dict, headers: dict)
         }
 
 
-def fetch_single_product(nvmid: str, cookies: str, headers: dict) -> dict:
+def fetch_single_product(nvmid: str, cookies: str, headers: dict, timing: RequestTiming | None = None) -> dict:
     """
     단일 상품 정보를 가져오는 함수 (병렬 처리용)
 
@@ -304,183 +1047,869 @@ def fetch_single_product(nvmid: str, cookies: str, headers: dict) -> dict:
         nvmid (str): 상품 NVM ID
         cookies (str): 쿠키 문자열
         headers (dict): 헤더 딕셔너리
+        timing (RequestTiming | None): 요청 수 제한 대기 / 업스트림 대기 시간을 기록할 객체
 
     Returns:
         dict: {nvmid: str, success: bool, product: dict or None, error: str or None}
     """
-    try:
-        url = "https://sell.smartstore.naver.com/api/product/shared/product-search-popular"
-        params = {
-            "_action": "productSearchPopularByCategory",
-            "nvMid": nvmid
-        }
+    return _fetch_single_product_pooled(nvmid, cookies, headers, timing)
 
-        # 쿠키 문자열을 딕셔너리로 변환
-        cookie_dict = {}
-        if isinstance(cookies, str):
-            for item in cookies.split(";"):
-                if "=" in item:
-                    key, value = item.strip().split("=", 1)
-                    cookie_dict[key] = value
 
-        # API 요청
-        response = requests.get(url, headers=headers, cookies=cookie_dict, params=params, timeout=10)
+# 상세 없는 "서버 오류:" 만 있는지 여부 (이 경우만 재시도 대상)
+def is_retriable_error(error_str):
+    if not error_str or not isinstance(error_str, str):
+        return False
+    s = error_str.strip()
+    if not s.startswith("서버 오류:"):
+        return False
+    detail = s[len("서버 오류:"):].strip()
+    return len(detail) == 0
 
-        if response.status_code != 200:
-            return {
-                "nvmid": nvmid,
-                "success": False,
-                "product": None,
-                "error": f"API 요청 실패: 상태 코드 {response.status_code}"
-            }
 
-        result = response.json()
+class SingleFlight:
+    """
+    같은 키(nvmid)의 요청이 이미 진행 중이면 새로 보내지 않고 진행 중인 요청의 결과를 함께 기다림
+    concurrent.futures.Future를 쓰므로 이벤트 루프(async)와 sync 스레드 양쪽에서 공유 가능
+    """
 
-        # 결과 파싱
-        if result and isinstance(result, dict) and "result" in result:
-            product_data = result["result"]
-            if isinstance(product_data, dict):
-                # 날짜 포맷팅
-                od = product_data.get("openDate")
-                if isinstance(od, str) and "T" in od:
-                    try:
-                        product_data["openDateFormatted"] = od.replace("T", " ").split("+")[0]
-                    except Exception:
-                        product_data["openDateFormatted"] = od
-                else:
-                    product_data["openDateFormatted"] = od if od else ""
+    def __init__(self):
+        self._inflight = {}  # key -> concurrent.futures.Future
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _claim(self, key) -> tuple[concurrent.futures.Future, bool]:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = concurrent.futures.Future()
+            self._inflight[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key, future: concurrent.futures.Future, result=None, error: BaseException | None = None):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run(self, key, func):
+        """sync 버전: func()를 실행하거나 진행 중인 같은 키의 결과를 기다림"""
+        future, leader = self._claim(key)
+        if not leader:
+            try:
+                return future.result()
+            except Exception:
+                return func()
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def run_async(self, key, coro_func):
+        """async 버전: await coro_func()를 실행하거나 진행 중인 같은 키의 결과를 기다림"""
+        future, leader = self._claim(key)
+        if not leader:
+            # shield: 기다리던 쪽이 취소돼도 공유 future는 취소되지 않도록
+            try:
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except BaseException:
+                # 먼저 보낸 쪽이 실패/취소된 경우에만 직접 요청 (내가 취소된 경우는 그대로 전파)
+                if future.done() and not future.cancelled() and future.exception() is not None:
+                    return await coro_func()
+                raise
+        try:
+            result = await coro_func()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
 
-                return {
-                    "nvmid": nvmid,
-                    "success": True,
-                    "product": product_data,
-                    "error": None
-                }
+    def stats(self) -> dict:
+        with self._lock:
+            inflight = len(self._inflight)
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "inflight": inflight}
 
+
+# 상품 조회 single-flight ("multi"/"single" 키 공간은 빈 결과 처리 방식이 달라 분리)
+product_flight = SingleFlight()
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 채워지고 최대 burst개까지 모아 쓸 수 있는 토큰 버킷 (스레드 안전)
+    rate가 0 이하이면 제한 없음
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """토큰이 있으면 하나 쓰고 0 반환, 없으면 쓰지 않고 다음 토큰까지 남은 시간(초) 반환"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기 (sync)"""
+        while True:
+            delay = self.try_acquire()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """토큰 하나를 얻을 때까지 대기 (async)"""
+        while True:
+            delay = self.try_acquire()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+
+# 계정(쿠키)별 초당 요청 수 / 버스트 (UPSTREAM_RATE_PER_COOKIE가 0 이하이면 제한 없음)
+# 같은 쿠키로 여러 요청이 동시에 들어와도 합계가 이 한도를 넘지 않도록 모든 fetch 경로가 같은 버킷을 공유
+# 기본은 제한 없음 (동시 요청 수는 AIMD가 조절): 업스트림이 계정별 한도를 요구할 때만 설정
+UPSTREAM_RATE_PER_COOKIE = float(os.environ.get("UPSTREAM_RATE_PER_COOKIE", 0))
+UPSTREAM_BURST_PER_COOKIE = float(os.environ.get("UPSTREAM_BURST_PER_COOKIE", 100))
+_RATE_LIMITER_IDLE_SECONDS = 600
+_rate_limiters = {}  # cookie_identity -> (TokenBucket, 마지막 사용 시각)
+_rate_limiters_lock = threading.Lock()
+
+
+def cookie_identity(cookies) -> str:
+    """
+    쿠키(문자열 또는 dict)의 계정 식별자 반환
+    NID_SES(네이버 로그인 세션)가 있으면 그 값, 없으면 쿠키 전체의 해시 (원문은 저장하지 않음)
+    """
+    cookie_dict = cookies if isinstance(cookies, dict) else parse_cookie_string(cookies)
+    session_id = cookie_dict.get("NID_SES")
+    if session_id:
+        source = f"NID_SES={session_id}"
+    elif isinstance(cookies, dict):
+        source = "; ".join(f"{k}={v}" for k, v in sorted(cookies.items()))
+    else:
+        source = str(cookies or "")
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def get_rate_limiter(cookies) -> TokenBucket:
+    """쿠키 식별자별로 공유되는 토큰 버킷 반환 (오래 안 쓴 버킷은 정리)"""
+    key = cookie_identity(cookies)
+    now = time.monotonic()
+    with _rate_limiters_lock:
+        entry = _rate_limiters.get(key)
+        if entry is None:
+            if len(_rate_limiters) >= 256:
+                for stale_key in [k for k, (_, used) in _rate_limiters.items() if now - used > _RATE_LIMITER_IDLE_SECONDS]:
+                    del _rate_limiters[stale_key]
+            bucket = TokenBucket(UPSTREAM_RATE_PER_COOKIE, UPSTREAM_BURST_PER_COOKIE)
+        else:
+            bucket = entry[0]
+        _rate_limiters[key] = (bucket, now)
+    return bucket
+
+
+def get_rate_limiter_stats() -> dict:
+    with _rate_limiters_lock:
+        accounts = len(_rate_limiters)
+    return {
+        "rate_per_cookie": UPSTREAM_RATE_PER_COOKIE,
+        "burst_per_cookie": UPSTREAM_BURST_PER_COOKIE,
+        "accounts": accounts,
+    }
+
+
+class UpstreamSessionPool:
+    """
+    동기 업스트림 호출(requests)용 keep-alive 세션 풀 (스레드 안전)
+    - 쿠키 식별자(cookie_identity)마다 requests.Session 하나를 여러 스레드가 공유 (urllib3 연결 풀은 스레드 안전)
+    - 세션마다 HTTPAdapter 연결 풀 pool_size개 (모자라면 기다리지 않고 임시 연결 사용)
+    - 응답 Set-Cookie는 세션에 저장하지 않음, 요청 쿠키는 호출하는 쪽이 Cookie 헤더로 보냄
+    - 세션이 max_sessions개를 넘으면 가장 오래 안 쓴 세션부터 닫음 (LRU)
+    """
+
+    def __init__(self, max_sessions: int, pool_size: int):
+        self.max_sessions = max_sessions
+        self.pool_size = pool_size
+        self._sessions = OrderedDict()  # cookie_identity -> requests.Session
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        return session
+
+    def get(self, cookies) -> requests.Session:
+        """쿠키(문자열 또는 dict)의 계정 식별자에 해당하는 세션 반환 (없으면 생성)"""
+        key = cookie_identity(cookies)
+        evicted = []
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is not None:
+                self._sessions.move_to_end(key)
+                self.hits += 1
+                return session
+            self.misses += 1
+            session = self._sessions[key] = self._create_session()
+            while len(self._sessions) > self.max_sessions:
+                evicted.append(self._sessions.popitem(last=False)[1])
+                self.evictions += 1
+        for old in evicted:
+            old.close()
+        return session
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            lookups = self.hits + self.misses
+            stats = {
+                "sessions": len(sessions),
+                "max_sessions": self.max_sessions,
+                "pool_size": self.pool_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+        # urllib3 연결 풀 카운터: 새로 연 연결 수 / 보낸 요청 수
+        connections = sent = 0
+        for session in sessions:
+            pools = session.get_adapter("https://").poolmanager.pools
+            for pool_key in pools.keys():
+                pool = pools.get(pool_key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    sent += pool.num_requests
+        stats["connections_created"] = connections
+        stats["requests"] = sent
+        stats["connection_reuse_ratio"] = round((sent - connections) / sent, 4) if sent else 0.0
+        return stats
+
+
+# 동기 호출 세션 풀 설정 (계정 수 상한 / 계정별 keep-alive 연결 수)
+UPSTREAM_SYNC_MAX_SESSIONS = int(os.environ.get("UPSTREAM_SYNC_MAX_SESSIONS", 64))
+UPSTREAM_SYNC_POOL_SIZE = int(os.environ.get("UPSTREAM_SYNC_POOL_SIZE", 32))
+upstream_session_pool = UpstreamSessionPool(UPSTREAM_SYNC_MAX_SESSIONS, UPSTREAM_SYNC_POOL_SIZE)
+
+
+class AIMDController:
+    """
+    업스트림 동시 요청 수를 AIMD(가산 증가 / 곱셈 감소)로 조절
+    200/500개 동시 처리 속도가 같았던 것처럼 실제 한계는 업스트림 쪽이므로, 응답 상태를 보고 한도를 찾아감
+
+    - 정상 응답: 응답 하나마다 increase / limit 만큼 증가 (한도만큼 성공하면 +increase)
+    - 200 이외 응답, 타임아웃/예외, 지연 증가: limit *= decrease_factor
+    - 지연 증가는 응답 하나가 아니라 성공 응답 latency_window개의 중앙값으로 판단
+      중앙값이 기준(최근 baseline_period초 동안의 창 중앙값 중 최솟값)의 latency_rise_ratio배를 넘으면
+      혼잡으로 봄 (꼬리 지연 하나로는 줄이지 않고, 업스트림이 계속 느려진 경우 기준이 baseline_period 뒤에 따라감)
+    - 감소 후 cooldown 동안은 추가 감소 없음 (같은 혼잡으로 여러 번 깎이지 않도록)
+    - in_flight: 프로세스 전체(모든 multi 요청 / 작업)에서 진행 중인 업스트림 요청 수
+      새 요청은 in_flight < limit일 때만 시작 (acquire / release, 자리가 나길 기다릴 때는 wait_for_slot)
+    이벤트 루프 스레드에서만 갱신
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, increase: float = 1.0,
+                 decrease_factor: float = 0.5, latency_rise_ratio: float = 2.0, latency_window: int = 50,
+                 baseline_period: float = 30.0, cooldown: float = 1.0):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_rise_ratio = latency_rise_ratio
+        self.latency_window = max(1, latency_window)
+        self.baseline_period = baseline_period
+        self.cooldown = cooldown
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self._window = []  # 이번 창의 성공 응답 지연 (초)
+        self._latency_p50 = None  # 마지막 창의 중앙값
+        self._window_medians = deque()  # (시각, 창 중앙값), 중앙값이 증가하는 순서로만 유지 (맨 앞이 최솟값)
+        self._last_decrease = 0.0
+        self._increases = 0
+        self._decreases = 0
+        self.in_flight = 0
+        self._waiters = []  # wait_for_slot()이 반환한 future (release 때 모두 깨움)
+
+    @property
+    def limit(self) -> int:
+        """현재 사용 중인 동시 요청 한도"""
+        return int(self._limit)
+
+    def has_slot(self) -> bool:
+        return self.in_flight < self.limit
+
+    def acquire(self):
+        """업스트림 요청 하나 시작 (has_slot()을 확인한 뒤 호출)"""
+        self.in_flight += 1
+
+    def release(self):
+        """업스트림 요청 하나 종료: 자리를 기다리던 요청들을 깨움"""
+        self.in_flight -= 1
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def wait_for_slot(self) -> asyncio.Future:
+        """다음 release 때 완료되는 future (기다리지 않게 되면 호출한 쪽에서 cancel)"""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return waiter
+
+    def _latency_rose(self, latency: float) -> bool:
+        """성공 응답 지연을 창에 모으고, 창이 찰 때 중앙값이 기준의 latency_rise_ratio배를 넘었는지 반환"""
+        self._window.append(latency)
+        if len(self._window) < self.latency_window:
+            return False
+        self._window.sort()
+        median = self._window[len(self._window) // 2]
+        self._window.clear()
+        self._latency_p50 = median
+        now = time.monotonic()
+        medians = self._window_medians
+        while medians and medians[0][0] < now - self.baseline_period:
+            medians.popleft()
+        baseline = self.latency_baseline
+        while medians and medians[-1][1] >= median:
+            medians.pop()
+        medians.append((now, median))
+        return baseline is not None and median > baseline * self.latency_rise_ratio
+
+    @property
+    def latency_baseline(self) -> float | None:
+        """최근 baseline_period초 동안의 창 중앙값 중 최솟값 (초)"""
+        return self._window_medians[0][1] if self._window_medians else None
+
+    def on_result(self, ok: bool, latency: float):
+        """요청 하나의 결과(성공 여부, 소요 시간 초)를 반영"""
+        if ok and not self._latency_rose(latency):
+            if self._limit < self.maximum:
+                self._limit = min(self.maximum, self._limit + self.increase / self._limit)
+                self._increases += 1
+            return
+
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self._limit = max(self.minimum, self._limit * self.decrease_factor)
+        self._decreases += 1
+
+    def snapshot(self) -> dict:
         return {
-            "nvmid": nvmid,
-            "success": False,
-            "product": None,
-            "error": "결과를 찾을 수 없습니다."
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "min": self.minimum,
+            "max": self.maximum,
+            "latency_p50_ms": round(self._latency_p50 * 1000, 1) if self._latency_p50 is not None else None,
+            "latency_baseline_ms": round(self.latency_baseline * 1000, 1) if self.latency_baseline is not None else None,
+            "increases": self._increases,
+            "decreases": self._decreases,
         }
 
+
+# 업스트림 동시 요청 수 상한
+# 실제 동시 요청 수는 UPSTREAM_MIN_IN_FLIGHT ~ UPSTREAM_MAX_IN_FLIGHT 사이에서 AIMD로 조절
+UPSTREAM_MAX_IN_FLIGHT = int(os.environ.get("UPSTREAM_MAX_IN_FLIGHT", 500))
+UPSTREAM_MIN_IN_FLIGHT = int(os.environ.get("UPSTREAM_MIN_IN_FLIGHT", 10))
+UPSTREAM_INITIAL_IN_FLIGHT = int(os.environ.get("UPSTREAM_INITIAL_IN_FLIGHT", 100))
+_concurrency_controller = AIMDController(UPSTREAM_INITIAL_IN_FLIGHT, UPSTREAM_MIN_IN_FLIGHT, UPSTREAM_MAX_IN_FLIGHT)
+
+
+async def _fetch_with_feedback(session: aiohttp.ClientSession, nvmid: str, cookies: str, headers: dict,
+                              raw: bool = False) -> dict:
+    """
+    fetch_single_product_async 결과와 소요 시간을 동시 요청 제어기(_concurrency_controller)에 반영
+    같은 nvmid가 이미 다른 요청에서 조회 중이면 그 결과를 함께 사용 (product_flight)
+    """
+    async def fetch():
+        started = time.perf_counter()
+        r = await fetch_single_product_async(session, nvmid, cookies, headers, raw=raw)
+        _concurrency_controller.on_result(r["success"], time.perf_counter() - started)
+        return r
+
+    r = await product_flight.run_async(("multi-raw" if raw else "multi", str(nvmid)), fetch)
+    return r if r["nvmid"] is nvmid else {**r, "nvmid": nvmid}
+
+
+async def iter_product_results(nvmids: list, cookies: str, headers: dict, max_retries: int = 3,
+                               max_age: float | None = None, use_cache: bool = True, raw: bool = False,
+                               timing: RequestTiming | None = None):
+    """
+    여러 nvmid를 sliding window 방식으로 병렬 조회하고, 완료되는 순서대로 결과를 하나씩 반환하는 비동기 제너레이터
+    공용 세션(get_shared_session)을 사용하므로 이벤트 루프 안에서 소비해야 함
+
+    - 고정 batch + 대기 없이, 요청 하나가 끝나 자리가 나면 바로 다음 nvmid 요청 시작
+    - 동시 요청은 프로세스 전체 합계가 _concurrency_controller.limit개(AIMD 조절)를 넘지 않도록,
+      초당 요청은 쿠키별 토큰 버킷(get_rate_limiter)으로 제한
+    - 재시도 대상(is_retriable_error)은 큐 뒤에 다시 넣어 nvmid당 최대 max_retries번 재요청
+    - 마지막 시도 결과는 실패여도 그대로 반환 (nvmid당 정확히 한 번 반환)
+    - use_cache이면 max_age 이내의 캐시(메모리 → 디스크, lookup_products)가 있는 nvmid는 업스트림 호출 없이 바로 반환
+    - raw이면 업스트림 결과를 파싱하지 않고 원문 그대로 반환 (fetch_single_product_async 참고)
+    - timing이 있으면 큐 대기 / 업스트림 대기 / 요청 수 제한 대기 / 재시도 횟수를 기록 (RequestTiming)
+    """
+    batch_started = time.perf_counter()
+    timing = timing or RequestTiming()
+    session = get_shared_session()
+    rate_limiter = get_rate_limiter(cookies)
+    cached = {}
+    if use_cache:
+        cached = await asyncio.get_running_loop().run_in_executor(None, lookup_products, nvmids, max_age)
+    PRODUCT_BATCH_ITEMS.inc(len(cached), source="cache")
+    queue = deque()
+    for nvmid in nvmids:
+        if nvmid in cached:
+            yield cached_result(nvmid, cached[nvmid])
+        else:
+            queue.append((nvmid, 0, batch_started))
+    pending = {}  # task -> (nvmid, 재시도 횟수, 요청 시작 시각)
+
+    try:
+        while queue or pending:
+            # 빈 자리만큼 새 요청 시작 (토큰이 없으면 다음 토큰까지 기다릴 시간만 기록)
+            # 자리는 다른 요청 / 작업과 함께 쓰므로, 다 찼으면 어느 요청이든 끝날 때까지(slot_waiter) 대기
+            wait_for_token = None
+            slot_waiter = None
+            while queue:
+                if not _concurrency_controller.has_slot():
+                    slot_waiter = _concurrency_controller.wait_for_slot()
+                    break
+                delay = rate_limiter.try_acquire()
+                if delay > 0:
+                    wait_for_token = delay
+                    break
+                nvmid, attempt, enqueued = queue.popleft()
+                now = time.perf_counter()
+                timing.add_queue(now - enqueued)
+                _concurrency_controller.acquire()
+                task = asyncio.ensure_future(_fetch_with_feedback(session, nvmid, cookies, headers, raw))
+                task.add_done_callback(lambda _: _concurrency_controller.release())
+                pending[task] = (nvmid, attempt, now)
+
+            wait_started = time.perf_counter()
+            if not pending and slot_waiter is None:
+                await asyncio.sleep(wait_for_token or 0)
+                timing.rate_wait += time.perf_counter() - wait_started
+                continue
+
+            waitables = [*pending, slot_waiter] if slot_waiter is not None else pending
+            done, _ = await asyncio.wait(waitables, timeout=wait_for_token, return_when=asyncio.FIRST_COMPLETED)
+            now = time.perf_counter()
+            if slot_waiter is not None:
+                slot_waiter.cancel()
+                done.discard(slot_waiter)
+            if wait_for_token is not None:
+                timing.rate_wait += now - wait_started
+            for task in done:
+                nvmid, attempt, started = pending.pop(task)
+                timing.add_upstream(now - started)
+                r = task.result()
+                if attempt < max_retries and not r["success"] and is_retriable_error(r.get("error") or ""):
+                    queue.append((nvmid, attempt + 1, now))
+                    timing.retry_rounds += 1
+                    UPSTREAM_RETRIES.inc()
+                    continue
+                PRODUCT_BATCH_ITEMS.inc(source="upstream")
+                yield r
+    finally:
+        for task in pending:
+            task.cancel()
+        PRODUCT_BATCH_SECONDS.observe(time.perf_counter() - batch_started)
+
+
+def dedup_nvmids(nvmids: list) -> tuple[list, dict]:
+    """
+    중복 제거(순서 유지)한 nvmid 목록과 nvmid -> [원래 인덱스들] 매핑 반환
+    (z_workers_endpoint.js / 호출 스크립트의 중복 제거와 같은 방식)
+    """
+    nvmid_to_indices = {}
+    for idx, nvmid in enumerate(nvmids):
+        nvmid_to_indices.setdefault(nvmid, []).append(idx)
+    return list(nvmid_to_indices), nvmid_to_indices
+
+
+async def collect_product_results(nvmids: list, cookies: str, headers: dict, fields: list | None = None, **options) -> list:
+    """
+    중복 제거한 nvmid만 한 번씩 조회하고, 결과를 원래 요청의 모든 위치에 다시 채운 리스트 반환
+    fields가 있으면 각 product에서 그 키만 남김
+    """
+    unique_nvmids, nvmid_to_indices = dedup_nvmids(nvmids)
+    results = [None] * len(nvmids)
+    async for r in iter_product_results(unique_nvmids, cookies, headers, **options):
+        r = project_result(r, fields)
+        for idx in nvmid_to_indices[r["nvmid"]]:
+            results[idx] = r
+    return results
+
+
+def validate_multi_body(data) -> tuple[dict, int] | None:
+    """/extract_productdata_multi 요청 body 검증. 문제가 있으면 (에러 응답, 상태 코드) 반환"""
+    if not data:
+        return {"success": False, "error": "JSON body가 필요합니다."}, 400
+    nvmids = data.get("nvmids")
+    if not nvmids:
+        return {"success": False, "error": "nvmids가 필요합니다."}, 400
+    if not isinstance(nvmids, list):
+        return {"success": False, "error": "nvmids는 리스트여야 합니다."}, 400
+    if not data.get("cookies"):
+        return {"success": False, "error": "cookies가 필요합니다."}, 400
+    if data.get("format", "json") not in ("json", "columnar"):
+        return {"success": False, "error": 'format은 "json" 또는 "columnar"여야 합니다.'}, 400
+    if data.get("raw") and (data.get("fields") or data.get("format", "json") != "json"):
+        return {"success": False, "error": "raw 모드에서는 fields / format을 함께 쓸 수 없습니다."}, 400
+    return validate_fields(data)
+
+
+def wants_ndjson(data: dict, accept: str) -> bool:
+    """스트리밍 모드 여부: "Accept: application/x-ndjson" 헤더 또는 body의 "stream": true"""
+    return bool(data.get("stream")) or "application/x-ndjson" in (accept or "")
+
+
+def build_multi_payload(nvmids: list, results: list, response_format: str = "json", fields: list | None = None) -> dict:
+    """
+    multi 응답 body 생성
+    response_format="columnar"이면 results 대신 fields / nvmids / rows / errors (columnar.py 참고)
+    """
+    success_count = sum(1 for r in results if r and r["success"])
+    fail_count = len(results) - success_count
+    unique_count = len(set(nvmids))
+    payload = {
+        "success": True,
+        "total": len(nvmids),
+        "success_count": success_count,
+        "fail_count": fail_count,
+        "original_unique_nvmids": unique_count,
+        "duplicates_removed": len(nvmids) - unique_count,
+    }
+    if response_format == "columnar":
+        payload.update(columnar.encode_results(nvmids, results, fields))
+    else:
+        payload["results"] = results
+    return payload
+
+
+def build_raw_multi_body(nvmids: list, results: list, timing: dict | None = None) -> bytes:
+    """raw 모드 multi 응답 body: build_multi_payload와 같은 구조를 결과 원문을 이어 붙여 직접 조립"""
+    head = build_multi_payload(nvmids, results)
+    del head["results"]
+    if timing is not None:
+        head["timing"] = timing
+    encoded = {}  # 중복 nvmid는 같은 결과 dict이므로 한 번만 직렬화
+    parts = []
+    for r in results:
+        part = encoded.get(id(r))
+        if part is None:
+            part = encoded[id(r)] = raw_result_bytes(r)
+        parts.append(part)
+    return json_codec.dumps(head)[:-1] + b',"results":[' + b",".join(parts) + b"]}"
+
+
+async def iter_ndjson_lines(nvmids: list, cookies: str, headers: dict, fields: list | None = None,
+                            raw: bool = False, timing: RequestTiming | None = None, **options):
+    """
+    스트리밍 모드 응답 줄(UTF-8 bytes) 생성: 요청 위치(index)당 한 줄 + 마지막 summary 줄
+    중복 nvmid는 한 번만 조회하고 같은 결과를 각 위치의 줄로 내보냄
+    timing이 있으면 summary 줄에 단계별 소요 시간(timing) 추가 (헤더는 본문보다 먼저 나가므로)
+    """
+    unique_nvmids, nvmid_to_indices = dedup_nvmids(nvmids)
+    success_count = 0
+    fail_count = 0
+    async for r in iter_product_results(unique_nvmids, cookies, headers, raw=raw, timing=timing, **options):
+        r = project_result(r, fields)
+        indices = nvmid_to_indices[r["nvmid"]]
+        if r["success"]:
+            success_count += len(indices)
+        else:
+            fail_count += len(indices)
+        if raw:
+            line = raw_result_bytes(r)[1:] + b"\n"
+            for idx in indices:
+                yield b'{"index":%d,' % idx + line
+            continue
+        for idx in indices:
+            yield json_codec.dumps({"index": idx, **r}) + b"\n"
+    summary = {
+        "summary": True,
+        "success": True,
+        "total": len(nvmids),
+        "success_count": success_count,
+        "fail_count": fail_count,
+        "original_unique_nvmids": len(unique_nvmids),
+        "duplicates_removed": len(nvmids) - len(unique_nvmids),
+    }
+    if timing is not None:
+        summary["timing"] = timing.as_dict()
+    yield json_codec.dumps(summary) + b"\n"
+
+
+def ndjson_error_line(e: Exception) -> bytes:
+    """스트리밍 도중 실패했을 때 마지막 줄 (헤더를 이미 보냈으므로 500 응답 대신 이 줄로 스트림을 끝냄)"""
+    return json_codec.dumps({"summary": True, "success": False, "error": f"서버 오류: {str(e)}"}) + b"\n"
+
+
+def guard_ndjson_lines(lines):
+    """sync 스트리밍 줄 생성기: 도중에 예외가 나면 ndjson_error_line을 마지막 줄로 보내고 종료"""
+    try:
+        yield from lines
     except Exception as e:
-        return {
-            "nvmid": nvmid,
-            "success": False,
-            "product": None,
-            "error": f"서버 오류: {str(e)}"
-        }
+        yield ndjson_error_line(e)
+
+
+def iter_in_background_loop(agen):
+    """비동기 제너레이터를 백그라운드 루프에서 한 단계씩 돌려 sync 제너레이터로 변환"""
+    try:
+        while True:
+            try:
+                yield run_in_background_loop(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        run_in_background_loop(agen.aclose())
 
 
 @app.route("/extract_productdata_multi", methods=["POST"])
 def extract_productdata_multi():
     """
     여러 nvmid를 받아서 완전 병렬로 상품 정보를 추출하는 엔드포인트
-    Request Body: { "nvmids": ["str", ...], "cookies": "string", "headers": "dict" }
-
-    aiohttp를 사용하여 대규모 병렬 처리 지원 (최대 500개 동시 처리 가능)
-    Flask[async] 없이 동기 route에서 내부적으로 asyncio 실행
+    Request Body: { "nvmids": ["str", ...], "cookies": "string", "headers": "dict",
+                    "max_age": 초(선택), "no_cache": bool(선택), "fields": ["productTitle", ...](선택) }
+
+    fields를 주면 각 product에서 그 키만 남겨서 반환 (캐시에는 전체 상품을 저장하고 응답 직전에 선택)
+    format: "columnar"이면 results 대신 키 목록(fields) + 값 배열(rows) + 에러 표(errors) + 키 구성이 다른 상품의 키(shapes)로 반환
+    (스트리밍 모드에는 적용 안 됨)
+    "Accept: application/msgpack"이면 MessagePack으로 반환 (msgpack 설치 시, 스트리밍 모드 제외)
+    "raw": true이면 업스트림 result 원문을 디코딩 / 재인코딩 없이 product로 이어 붙이고 openDateFormatted는
+    product 옆 필드로 반환 (JSON / 스트리밍만, fields / format / msgpack과 함께 쓸 수 없음, 새로 받은 상품은 캐시에 저장 안 함)
+    압축: 요청 본문은 "Content-Encoding: gzip|zstd"로 보낼 수 있고, 응답은 Accept-Encoding에 따라 zstd / br / gzip으로 압축
+
+    aiohttp를 사용하여 대규모 병렬 처리 지원 (sliding window, 동시 요청 수는 AIMD로 최대 500개까지 조절 /
+    UPSTREAM_RATE_PER_COOKIE를 설정하면 쿠키별 초당 요청 수 제한)
+    Flask[async] 없이 동기 route에서 공용 백그라운드 루프(get_background_loop)에 작업 제출
+
+    스트리밍 모드: "Accept: application/x-ndjson" 헤더 또는 body의 "stream": true
+    - nvmid 하나가 끝날 때마다 한 줄({"index": int, nvmid, success, product, error}) 즉시 전송
+    - 마지막 줄: {"summary": true, "success": true, "total", "success_count", "fail_count",
+                 "original_unique_nvmids", "duplicates_removed"}
+    - 도중에 서버 오류가 나면 마지막 줄: {"summary": true, "success": false, "error": "서버 오류: ..."}
+
+    중복 nvmid는 서버에서 한 번만 조회하고 결과를 원래 위치마다 채워서 반환 (duplicates_removed로 보고)
+
+    단계별 소요 시간(RequestTiming)은 Server-Timing 헤더로 반환 (스트리밍 모드는 parse만)
+    "timing": true이면 body에도 timing 블록 추가 (스트리밍 모드는 summary 줄에)
     """
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"success": False, "error": "JSON body가 필요합니다."}), 400
+        timing = RequestTiming()
+        data, error = decode_request_json(request.get_data(), request.headers.get("Content-Encoding"))
+        error = error or validate_multi_body(data)
+        if error:
+            return jsonify(error[0]), error[1]
 
         nvmids = data.get("nvmids")
         cookies = data.get("cookies")
-        client_headers = data.get("headers", {})
+        headers = resolve_headers(data.get("headers", {}))
+        max_age, use_cache = cache_options(data)
+        timing.mark_parsed()
+
+        if wants_ndjson(data, request.headers.get("Accept", "")):
+            lines = guard_ndjson_lines(iter_in_background_loop(iter_ndjson_lines(
+                nvmids, cookies, headers, fields=data.get("fields"), raw=bool(data.get("raw")),
+                timing=timing if data.get("timing") else None, max_age=max_age, use_cache=use_cache
+            )))
+            encoding = compression.choose_encoding(request.headers.get("Accept-Encoding"))
+            response_headers = {"Vary": "Accept-Encoding", "Server-Timing": timing.header(parse_only=True)}
+            if encoding is None:
+                return Response(lines, mimetype="application/x-ndjson", headers=response_headers)
+            response_headers["Content-Encoding"] = encoding
+            return Response(compress_chunks(lines, encoding), mimetype="application/x-ndjson", headers=response_headers)
+
+        if data.get("raw"):
+            results = run_in_background_loop(collect_product_results(nvmids, cookies, headers, raw=True, max_age=max_age, use_cache=use_cache,
+                                                                     timing=timing))
+            serialize_started = time.perf_counter()
+            body = build_raw_multi_body(nvmids, results, timing.as_dict() if data.get("timing") else None)
+            body, response_headers = encode_response_body(body, request.headers.get("Accept-Encoding"))
+            timing.serialize = time.perf_counter() - serialize_started
+            response_headers["Server-Timing"] = timing.header()
+            return Response(body, headers=response_headers, mimetype="application/json")
+
+        results = run_in_background_loop(collect_product_results(nvmids, cookies, headers, fields=data.get("fields"), max_age=max_age, use_cache=use_cache,
+                                                                 timing=timing))
+        payload = build_multi_payload(nvmids, results, data.get("format", "json"), data.get("fields"))
+        if data.get("timing"):
+            payload["timing"] = timing.as_dict()
+        return encoded_response(payload, timing=timing)
 
-        if not nvmids:
-            return jsonify({"success": False, "error": "nvmids가 필요합니다."}), 400
-        if not isinstance(nvmids, list):
-            return jsonify({"success": False, "error": "nvmids는 리스트여야 합니다."}), 400
-        if not cookies:
-            return jsonify({"success": False, "error": "cookies가 필요합니다."}), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"서버 오류: {str(e)}"
+        }), 500
 
-        # 헤더 설정
-        headers = client_headers if isinstance(client_headers, dict) and client_headers else {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
-            "Referer": "https://sell.smartstore.naver.com/",
-        }
 
-        # 상세 없는 "서버 오류:" 만 있는지 여부 (이 경우만 재시도 대상)
-        def is_retriable_error(error_str):
-            if not error_str or not isinstance(error_str, str):
-                return False
-            s = error_str.strip()
-            if not s.startswith("서버 오류:"):
-                return False
-            detail = s[len("서버 오류:"):].strip()
-            return len(detail) == 0
-
-        # asyncio를 사용하여 batch 단위 병렬 처리 실행 (500개 동시)
-        async def run_parallel(nvmid_list):
-            max_concurrent = 500   # 전체 동시 연결 수 (200/500 동일 처리 속도)
-            max_per_host = 500     # 호스트당 동시 연결 수
-
-            connector = aiohttp.TCPConnector(
-                limit=max_concurrent,
-                limit_per_host=max_per_host,
-                ttl_dns_cache=600,  # DNS 캐시 시간 증가
-                enable_cleanup_closed=True,  # 닫힌 연결 정리 활성화
-                force_close=False,  # 연결 재사용
-                keepalive_timeout=30,  # keep-alive 타임아웃
-            )
-            timeout = aiohttp.ClientTimeout(
-                total=30,
-                connect=10,  # 연결 타임아웃
-                sock_read=10  # 소켓 읽기 타임아웃
-            )
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                tasks = [fetch_single_product_async(session, nvmid, cookies, headers) for nvmid in nvmid_list]
-                return list(await asyncio.gather(*tasks))
-
-        # Batch 처리: 500개씩 나누어 순차 처리, batch 간 0.3초 대기
-        batch_size = 500
-        all_results = []
-        nvmid_to_index = {nvmid: i for i, nvmid in enumerate(nvmids)}
-
-        for i in range(0, len(nvmids), batch_size):
-            batch_nvmids = nvmids[i:i + batch_size]
-            batch_results = asyncio.run(run_parallel(batch_nvmids))
-            all_results.extend(batch_results)
-
-            # 다음 batch를 위해 0.3초 대기 (마지막 batch는 제외)
-            if i + batch_size < len(nvmids):
-                time.sleep(0.3)  # 동기 함수에서 time 사용
-
-        # 결과 재구성
-        results = [None] * len(nvmids)
-        for result in all_results:
-            idx = nvmid_to_index[result["nvmid"]]
-            results[idx] = result
-
-        # 상세 없는 "서버 오류:" 만 있는 실패만 모아서 최대 3번 재시도
-        retry_nvmids = [r["nvmid"] for r in results if r and not r["success"] and is_retriable_error(r.get("error") or "")]
-        max_retries = 3
-        retry_count = 0
-
-        while retry_nvmids and retry_count < max_retries:
-            retry_count += 1
-            retry_results = asyncio.run(run_parallel(retry_nvmids))
-            for retry_result in retry_results:
-                idx = nvmid_to_index[retry_result["nvmid"]]
-                results[idx] = retry_result
-            retry_nvmids = [r["nvmid"] for r in retry_results if not r["success"] and is_retriable_error(r.get("error") or "")]
-
-        success_count = sum(1 for r in results if r and r["success"])
-        fail_count = len(results) - success_count
+class ProductJob:
+    """
+    /jobs로 제출된 대량 nvmid 조회 작업
+    HTTP 요청 타임아웃과 무관하게 백그라운드에서 실행되고, 결과는 완료 순서대로 쌓여 offset으로 나눠 받음
+    """
 
-        return jsonify({
+    def __init__(self, nvmids: list):
+        self.job_id = uuid.uuid4().hex
+        self.nvmids = nvmids
+        self.unique_count = len(set(nvmids))
+        self.status = "running"  # running | done | error
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.results = []  # 완료 순서대로 {"index": 원래 위치, nvmid, success, product, error}
+        self.success_count = 0
+        self.fail_count = 0
+        self.task = None  # 비동기 서버 모드에서 실행 중인 asyncio.Task (GC 방지용 참조)
+        self._lock = threading.Lock()
+
+    def add(self, indices: list, result: dict):
+        with self._lock:
+            for idx in indices:
+                self.results.append({"index": idx, **result})
+            if result["success"]:
+                self.success_count += len(indices)
+            else:
+                self.fail_count += len(indices)
+
+    def finish(self, error: str | None = None):
+        self.status = "error" if error else "done"
+        self.error = error
+        self.finished_at = time.time()
+
+    def progress(self) -> dict:
+        with self._lock:
+            done = self.success_count
+            failed = self.fail_count
+        end = self.finished_at or time.time()
+        return {
+            "success": True,
+            "job_id": self.job_id,
+            "status": self.status,
+            "error": self.error,
+            "total": len(self.nvmids),
+            "done": done,
+            "failed": failed,
+            "pending": len(self.nvmids) - done - failed,
+            "original_unique_nvmids": self.unique_count,
+            "duplicates_removed": len(self.nvmids) - self.unique_count,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(end - self.created_at, 2),
+        }
+
+    def results_page(self, offset: int, limit: int) -> dict:
+        """offset번째 완료 결과부터 최대 limit개 (next_offset으로 이어서 조회)"""
+        with self._lock:
+            page = self.results[offset:offset + limit]
+            available = len(self.results)
+        next_offset = offset + len(page)
+        return {
             "success": True,
-            "total": len(nvmids),
-            "success_count": success_count,
-            "fail_count": fail_count,
-            "results": results
-        }), 200
+            "job_id": self.job_id,
+            "status": self.status,
+            "offset": offset,
+            "next_offset": next_offset,
+            "available": available,
+            "complete": self.status != "running" and next_offset >= available,
+            "results": page,
+        }
+
+
+# 작업 보관 시간 (끝난 작업은 이 시간이 지나면 정리)
+JOB_RETENTION_SECONDS = float(os.environ.get("JOB_RETENTION_SECONDS", 3600))
+JOB_RESULTS_PAGE_MAX = 10000
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def create_job(nvmids: list) -> ProductJob:
+    job = ProductJob(nvmids)
+    now = time.time()
+    with _jobs_lock:
+        for job_id in [k for k, j in _jobs.items() if j.finished_at and now - j.finished_at > JOB_RETENTION_SECONDS]:
+            del _jobs[job_id]
+        _jobs[job.job_id] = job
+    return job
+
+
+def get_job(job_id: str) -> ProductJob | None:
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+async def run_product_job(job: ProductJob, cookies: str, headers: dict, fields: list | None = None, **options):
+    """작업 실행: 중복 제거 후 sliding window로 조회하며 결과를 job에 바로 쌓음"""
+    unique_nvmids, nvmid_to_indices = dedup_nvmids(job.nvmids)
+    try:
+        async for r in iter_product_results(unique_nvmids, cookies, headers, **options):
+            job.add(nvmid_to_indices[r["nvmid"]], project_result(r, fields))
+        job.finish()
+    except Exception as e:
+        job.finish(f"서버 오류: {str(e)}")
+
+
+def parse_page_args(args) -> tuple[int, int]:
+    """결과 조회 query string (offset, limit) 파싱"""
+    try:
+        offset = max(0, int(args.get("offset", 0)))
+        limit = min(JOB_RESULTS_PAGE_MAX, max(1, int(args.get("limit", 1000))))
+    except (TypeError, ValueError):
+        offset, limit = 0, 1000
+    return offset, limit
+
+
+@app.route("/jobs", methods=["POST"])
+def create_product_job():
+    """
+    대량 nvmid 조회 작업 제출 (즉시 job_id 반환, 실제 조회는 백그라운드 루프에서 진행)
+    Request Body: /extract_productdata_multi와 동일
+    Response (202): { "success": true, "job_id": "...", "status": "running", "total": int }
+    진행 상황: GET /jobs/<job_id>, 결과: GET /jobs/<job_id>/results?offset=0&limit=1000
+    """
+    try:
+        data, error = decode_request_json(request.get_data(), request.headers.get("Content-Encoding"))
+        error = error or validate_multi_body(data)
+        if error:
+            return jsonify(error[0]), error[1]
+
+        max_age, use_cache = cache_options(data)
+        job = create_job(data.get("nvmids"))
+        asyncio.run_coroutine_threadsafe(
+            run_product_job(job, data.get("cookies"), resolve_headers(data.get("headers", {})),
+                            fields=data.get("fields"), max_age=max_age, use_cache=use_cache),
+            get_background_loop(),
+        )
+        return jsonify({"success": True, "job_id": job.job_id, "status": job.status, "total": len(job.nvmids)}), 202
 
     except Exception as e:
         return jsonify({
@@ -489,6 +1918,284 @@ def extract_productdata_multi():
         }), 500
 
 
+@app.route("/jobs/<job_id>")
+def product_job_progress(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "job을 찾을 수 없습니다."}), 404
+    return jsonify(job.progress()), 200
+
+
+@app.route("/jobs/<job_id>/results")
+def product_job_results(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "job을 찾을 수 없습니다."}), 404
+    offset, limit = parse_page_args(request.args)
+    return encoded_response(job.results_page(offset, limit))
+
+
+# 비동기 서버 모드 (aiohttp.web)
+# Flask 앱과 같은 route를 하나의 이벤트 루프에서 처리하므로, multi 요청이 도는 동안에도
+# /health 등 다른 요청이 막히지 않는다. fetch/파싱 로직과 공용 세션은 Flask 모드와 공유.
+# 실행: python hello.py --server async  또는
+#       gunicorn 'hello:create_async_app()' --worker-class aiohttp.GunicornWebWorker
+def async_json_response(payload, status: int = 200) -> web.Response:
+    """json_codec으로 직렬화한 UTF-8 JSON 응답"""
+    return web.Response(body=json_codec.dumps(payload), status=status, content_type="application/json")
+
+
+async def async_encoded_response(req: web.Request, payload, status: int = 200,
+                                 timing: RequestTiming | None = None) -> web.Response:
+    """
+    Accept(JSON / MessagePack)로 직렬화하고 Accept-Encoding에 맞춰 압축한 응답 (큰 본문의 압축은 executor에서 실행)
+    timing이 있으면 직렬화 시간을 더해 Server-Timing 헤더 추가
+    """
+    serialize_started = time.perf_counter()
+    body, content_type = serialize_payload(payload, req.headers.get("Accept"))
+    body, headers = await asyncio.get_running_loop().run_in_executor(
+        None, encode_response_body, body, req.headers.get("Accept-Encoding")
+    )
+    if timing is not None:
+        timing.serialize = time.perf_counter() - serialize_started
+        headers["Server-Timing"] = timing.header()
+    return web.Response(body=body, status=status, headers=headers, content_type=content_type)
+
+
+async def async_index(req: web.Request) -> web.Response:
+    return web.Response(text="hello, world")
+
+
+async def async_health(req: web.Request) -> web.Response:
+    return async_json_response({"status": "ok"})
+
+
+async def async_stats(req: web.Request) -> web.Response:
+    return async_json_response(collect_stats())
+
+
+async def async_metrics(req: web.Request) -> web.Response:
+    return web.Response(text=metrics_registry.render(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
+
+@web.middleware
+async def metrics_middleware(req: web.Request, handler):
+    """route별 요청 처리 시간 기록 (Flask의 _observe_request와 같은 지표)"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(req)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        resource = req.match_info.route.resource
+        route = resource.canonical if resource is not None else "unmatched"
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, method=req.method, status=status)
+
+
+async def async_extract_productdata(req: web.Request) -> web.Response:
+    """/extract_productdata 비동기 버전 (응답 형식/상태 코드는 Flask 버전과 동일)"""
+    try:
+        timing = RequestTiming()
+        data, error = decode_request_json(await req.read(), req.headers.get("Content-Encoding"))
+        if error:
+            return async_json_response(error[0], status=error[1])
+        if not data:
+            return async_json_response({"success": False, "error": "JSON body가 필요합니다."}, status=400)
+
+        nvmid = data.get("nvmid")
+        cookies = data.get("cookies")
+
+        if not nvmid:
+            return async_json_response({"success": False, "error": "nvmid가 필요합니다."}, status=400)
+        if not cookies:
+            return async_json_response({"success": False, "error": "cookies가 필요합니다."}, status=400)
+        error = validate_fields(data)
+        if error:
+            return async_json_response(error[0], status=error[1])
+        fields = data.get("fields")
+        timing.mark_parsed()
+
+        max_age, use_cache = cache_options(data)
+        cached = None
+        if use_cache:
+            found = await asyncio.get_running_loop().run_in_executor(None, lookup_products, [nvmid], max_age)
+            cached = found.get(nvmid)
+        if cached is not None:
+            payload = {"success": True, "products": [project_product(cached, fields)], "nvmid": nvmid}
+            if data.get("timing"):
+                payload["timing"] = timing.as_dict()
+            return await async_encoded_response(req, payload, timing=timing)
+
+        headers = resolve_headers(data.get("headers", {}))
+
+        async def fetch():
+            wait_started = time.perf_counter()
+            await get_rate_limiter(cookies).acquire_async()
+            upstream_started = time.perf_counter()
+            timing.rate_wait += upstream_started - wait_started
+            try:
+                return await fetch_single_product_async(get_shared_session(), nvmid, cookies, headers, empty_as_success=False)
+            finally:
+                timing.add_upstream(time.perf_counter() - upstream_started)
+
+        result = await product_flight.run_async(("single", str(nvmid)), fetch)
+        payload, status = single_response(nvmid, project_result(result, fields))
+        if data.get("timing"):
+            payload["timing"] = timing.as_dict()
+        return await async_encoded_response(req, payload, status=status, timing=timing)
+
+    except Exception as e:
+        return async_json_response({
+            "success": False,
+            "error": f"서버 오류: {str(e)}"
+        }, status=500)
+
+
+async def async_ndjson_response(req: web.Request, lines, response_headers: dict, encoding: str | None) -> web.StreamResponse:
+    """
+    NDJSON 스트리밍 응답 전송 (lines: 줄 bytes 비동기 제너레이터)
+    헤더를 보낸 뒤에는 500 응답으로 바꿀 수 없으므로, 도중에 실패하면 ndjson_error_line을 마지막 줄로 보내고 정상 종료
+    클라이언트가 연결을 끊었으면 그대로 종료
+    """
+    compressor = compression.StreamCompressor(encoding) if encoding else None
+    response = web.StreamResponse(headers=response_headers)
+    await response.prepare(req)
+    try:
+        try:
+            async for line in lines:
+                await response.write(compressor.compress(line) if compressor else line)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            line = ndjson_error_line(e)
+            await response.write(compressor.compress(line) if compressor else line)
+        if compressor:
+            await response.write(compressor.finish())
+        await response.write_eof()
+    except ConnectionError:
+        pass  # 클라이언트가 연결을 끊음
+    finally:
+        await lines.aclose()
+    return response
+
+
+async def async_extract_productdata_multi(req: web.Request) -> web.StreamResponse:
+    """/extract_productdata_multi 비동기 버전 (스트리밍 모드 포함, Flask 버전과 동일한 응답)"""
+    try:
+        timing = RequestTiming()
+        data, error = decode_request_json(await req.read(), req.headers.get("Content-Encoding"))
+        error = error or validate_multi_body(data)
+        if error:
+            return async_json_response(error[0], status=error[1])
+
+        nvmids = data.get("nvmids")
+        cookies = data.get("cookies")
+        headers = resolve_headers(data.get("headers", {}))
+        max_age, use_cache = cache_options(data)
+        timing.mark_parsed()
+
+        if wants_ndjson(data, req.headers.get("Accept", "")):
+            encoding = compression.choose_encoding(req.headers.get("Accept-Encoding"))
+            response_headers = {"Content-Type": "application/x-ndjson", "Vary": "Accept-Encoding",
+                                "Server-Timing": timing.header(parse_only=True)}
+            if encoding:
+                response_headers["Content-Encoding"] = encoding
+            lines = iter_ndjson_lines(nvmids, cookies, headers, fields=data.get("fields"), raw=bool(data.get("raw")),
+                                      timing=timing if data.get("timing") else None, max_age=max_age, use_cache=use_cache)
+            # prepare() 이후의 예외는 async_ndjson_response 안에서 처리 (아래 except는 헤더를 보내기 전까지만)
+            return await async_ndjson_response(req, lines, response_headers, encoding)
+
+        if data.get("raw"):
+            results = await collect_product_results(nvmids, cookies, headers, raw=True, max_age=max_age, use_cache=use_cache,
+                                                    timing=timing)
+            serialize_started = time.perf_counter()
+            body = build_raw_multi_body(nvmids, results, timing.as_dict() if data.get("timing") else None)
+            body, response_headers = await asyncio.get_running_loop().run_in_executor(
+                None, encode_response_body, body, req.headers.get("Accept-Encoding")
+            )
+            timing.serialize = time.perf_counter() - serialize_started
+            response_headers["Server-Timing"] = timing.header()
+            return web.Response(body=body, headers=response_headers, content_type="application/json")
+
+        results = await collect_product_results(nvmids, cookies, headers, fields=data.get("fields"), max_age=max_age, use_cache=use_cache,
+                                                timing=timing)
+        payload = build_multi_payload(nvmids, results, data.get("format", "json"), data.get("fields"))
+        if data.get("timing"):
+            payload["timing"] = timing.as_dict()
+        return await async_encoded_response(req, payload, timing=timing)
+
+    except Exception as e:
+        return async_json_response({
+            "success": False,
+            "error": f"서버 오류: {str(e)}"
+        }, status=500)
+
+
+async def async_create_product_job(req: web.Request) -> web.Response:
+    """/jobs 비동기 버전 (작업은 서버 이벤트 루프에서 실행)"""
+    try:
+        data, error = decode_request_json(await req.read(), req.headers.get("Content-Encoding"))
+        error = error or validate_multi_body(data)
+        if error:
+            return async_json_response(error[0], status=error[1])
+
+        max_age, use_cache = cache_options(data)
+        job = create_job(data.get("nvmids"))
+        job.task = asyncio.ensure_future(
+            run_product_job(job, data.get("cookies"), resolve_headers(data.get("headers", {})),
+                            fields=data.get("fields"), max_age=max_age, use_cache=use_cache)
+        )
+        return async_json_response({"success": True, "job_id": job.job_id, "status": job.status, "total": len(job.nvmids)}, status=202)
+
+    except Exception as e:
+        return async_json_response({
+            "success": False,
+            "error": f"서버 오류: {str(e)}"
+        }, status=500)
+
+
+async def async_product_job_progress(req: web.Request) -> web.Response:
+    job = get_job(req.match_info["job_id"])
+    if job is None:
+        return async_json_response({"success": False, "error": "job을 찾을 수 없습니다."}, status=404)
+    return async_json_response(job.progress())
+
+
+async def async_product_job_results(req: web.Request) -> web.Response:
+    job = get_job(req.match_info["job_id"])
+    if job is None:
+        return async_json_response({"success": False, "error": "job을 찾을 수 없습니다."}, status=404)
+    offset, limit = parse_page_args(req.query)
+    return await async_encoded_response(req, job.results_page(offset, limit))
+
+
+async def _close_session_on_cleanup(async_app: web.Application):
+    if _shared_session is not None and not _shared_session.closed and _shared_session_loop is asyncio.get_running_loop():
+        await _shared_session.close()
+
+
+def create_async_app() -> web.Application:
+    """aiohttp.web 애플리케이션 생성 (Flask app과 같은 route 제공)"""
+    # 압축된 요청 본문(gzip / zstd)은 decode_request_json에서 직접 해제해서 두 서버 모드의 동작을 맞춤
+    async_app = web.Application(client_max_size=64 * 1024 * 1024, handler_args={"auto_decompress": False},
+                                middlewares=[metrics_middleware])
+    async_app.router.add_get("/", async_index)
+    async_app.router.add_get("/health", async_health)
+    async_app.router.add_get("/stats", async_stats)
+    async_app.router.add_get("/metrics", async_metrics)
+    async_app.router.add_post("/extract_productdata", async_extract_productdata)
+    async_app.router.add_post("/extract_productdata_multi", async_extract_productdata_multi)
+    async_app.router.add_post("/jobs", async_create_product_job)
+    async_app.router.add_get("/jobs/{job_id}", async_product_job_progress)
+    async_app.router.add_get("/jobs/{job_id}/results", async_product_job_results)
+    async_app.on_cleanup.append(_close_session_on_cleanup)
+    return async_app
+
+
 def get_service_url_from_cli(service_id: str) -> str | None:
     """Render CLI로 서비스 목록을 조회해 service_id에 해당하는 URL 반환."""
     try:
@@ -526,9 +2233,12 @@ def get_service_url_from_cli(service_id: str) -> str | None:
         return None
 
 
-def main_serve():
+def main_serve(server_mode: str = "flask"):
     port = int(os.environ.get("PORT", 5678))  # 로컬 테스트용 5678포트
-    app.run(host="0.0.0.0", port=port)
+    if server_mode == "async":
+        web.run_app(create_async_app(), host="0.0.0.0", port=port)
+    else:
+        app.run(host="0.0.0.0", port=port)
 
 
 def main_deploy_and_call():
@@ -603,6 +2313,12 @@ if __name__ == "__main__":
         action="store_true",
         help="로컬에서 Flask 서버 실행 (기본: 서버 실행)",
     )
+    parser.add_argument(
+        "--server",
+        choices=["flask", "async"],
+        default=os.environ.get("SERVER_MODE", "flask"),
+        help="서버 종류: flask(기본) 또는 async(aiohttp.web, 이벤트 루프 하나로 동시 요청 처리). 환경 변수 SERVER_MODE로도 지정",
+    )
     parser.add_argument(
         "--deploy-and-call",
         action="store_true",
@@ -613,4 +2329,4 @@ if __name__ == "__main__":
     if args.deploy_and_call:
         main_deploy_and_call()
     else:
-        main_serve()
+        main_serve(args.server)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+서버(hello.py)와 호출 스크립트가 함께 쓰는 JSON 코덱
+- orjson이 설치되어 있으면 사용하고, 없으면 표준 json으로 대체
+- loads: 응답 bytes를 str로 디코딩하지 않고 바로 파싱
+- dumps: 한글(productTitle, mallName, category 등)을 \\uXXXX로 이스케이프하지 않은 UTF-8 bytes 반환
+- dump_file: 결과 JSON 파일 저장 (기본 indent=2)
+- value_span / find_scalar: 파싱 없이 원문 bytes에서 값 위치 / 단일 값 찾기 (서버 raw 모드)
+"""
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+# orjson.JSONDecodeError는 json.JSONDecodeError의 하위 클래스라 이 하나로 둘 다 잡힘
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data):
+    """bytes / bytearray / memoryview / str JSON 파싱"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode("utf-8")
+    return json.loads(data)
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """
+    obj를 UTF-8 JSON bytes로 직렬화 (ASCII 이스케이프 없음)
+    indent=True이면 2칸 들여쓰기
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            # orjson이 못 다루는 값(64비트를 넘는 정수, 문자열이 아닌 키 등)은 표준 json으로
+            pass
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dump_file(obj, path, indent: bool = True):
+    """obj를 JSON 파일로 저장 (UTF-8, 기본 indent=2)"""
+    with open(path, "wb") as f:
+        f.write(dumps(obj, indent=indent))
+
+
+# raw 모드용: 전체를 파싱하지 않고 bytes에서 값의 위치만 찾음
+# 문자열과 괄호가 아닌 문자는 정규식이 C 수준에서 한 번에 건너뛰므로 Python 루프는 괄호 수만큼만 돔
+_WS = re.compile(rb"\s*")
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SCALAR = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[^,}\]\s]+')
+_SKIP_TO_BRACKET = re.compile(rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*')
+
+
+def _container_end(data: bytes, pos: int) -> int:
+    """data[pos]의 { 또는 [ 에 대응하는 닫는 괄호 바로 다음 위치"""
+    depth = 0
+    while pos < len(data):
+        c = data[pos]
+        if c in b"{[":
+            depth += 1
+        elif c in b"}]":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        else:
+            break  # 닫히지 않은 문자열
+        pos = _SKIP_TO_BRACKET.match(data, pos + 1).end()
+    raise ValueError("JSON 객체가 닫히지 않았습니다.")
+
+
+def value_span(data: bytes, key: str) -> tuple[int, int] | None:
+    """
+    최상위 JSON 객체에서 key 값이 차지하는 bytes 범위 반환 (디코딩 없음)
+
+    Returns:
+        tuple | None: (start, end) → data[start:end]가 값의 JSON 원문, 키가 없거나 형식이 다르면 None
+    """
+    target = b'"' + key.encode("utf-8") + b'"'
+    pos = _WS.match(data).end()
+    if data[pos:pos + 1] != b"{":
+        return None
+    pos += 1
+    try:
+        while True:
+            name = _STRING.match(data, _WS.match(data, pos).end())
+            if name is None:
+                return None
+            pos = _WS.match(data, name.end()).end()
+            if data[pos:pos + 1] != b":":
+                return None
+            start = _WS.match(data, pos + 1).end()
+            if data[start:start + 1] in (b"{", b"["):
+                end = _container_end(data, start)
+            else:
+                scalar = _SCALAR.match(data, start)
+                if scalar is None:
+                    return None
+                end = scalar.end()
+            if name.group() == target:
+                return start, end
+            pos = _WS.match(data, end).end()
+            if data[pos:pos + 1] != b",":
+                return None
+            pos += 1
+    except ValueError:
+        return None
+
+
+def find_scalar(data: bytes, key: str):
+    """data에서 처음 나오는 "key": <문자열 / 숫자 / true / false / null> 값을 파싱해서 반환 (없으면 None)"""
+    match = re.search(
+        b'"' + re.escape(key.encode("utf-8")) + rb'"\s*:\s*("[^"\\]*(?:\\.[^"\\]*)*"|-?[0-9][0-9.eE+-]*|true|false|null)',
+        data,
+    )
+    return loads(match.group(1)) if match else None
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 부하 테스트용 가짜 업스트림 (/api/product/shared/product-search-popular)
+- z.json(run_multi 결과) 또는 zz.json(호출 스크립트 결과)에서 상품을 읽어서, nvmid마다 항상 같은 상품을 골라 응답
+- 지연 시간 분포(fixed / uniform / exponential / lognormal), 에러(500), 빈 본문(200), 429 비율을 옵션으로 조절
+- GET /stats: 받은 요청 수, 상태별 응답 수, 현재 동시 요청 수 / 최대 동시 요청 수
+
+사용법: python mock_upstream.py [--port 18080] [--source z.json] [--latency-ms 50] [--latency-dist lognormal]
+        [--error-rate 0.01] [--empty-rate 0.01] [--rate-429 0.01]
+서버 연결: UPSTREAM_BASE_URL=http://127.0.0.1:18080 python hello.py --serve
+"""
+import argparse
+import asyncio
+import math
+import random
+import zlib
+from pathlib import Path
+
+from aiohttp import web
+
+import json_codec
+
+DEFAULT_PORT = 18080
+API_PATH = "/api/product/shared/product-search-popular"
+
+
+def load_records(source: Path) -> list:
+    """z.json / zz.json에서 성공한 상품 dict 목록 로드 (openDateFormatted는 업스트림에 없는 필드라 제거)"""
+    with open(source, "rb") as f:
+        data = json_codec.loads(f.read())
+    records = []
+    for r in data.get("results") or []:
+        if not r or not r.get("success"):
+            continue
+        product = r.get("product") or (r.get("products") or [None])[0]
+        if product:
+            product = dict(product)
+            product.pop("openDateFormatted", None)
+            records.append(product)
+    return records
+
+
+def make_latency_sampler(dist: str, mean_ms: float, jitter: float):
+    """
+    응답 지연(초)을 뽑는 함수 반환
+
+    Args:
+        dist (str): "fixed" | "uniform" | "exponential" | "lognormal"
+        mean_ms (float): 평균 지연 (ms)
+        jitter (float): uniform은 ±비율, lognormal은 sigma (꼬리 길이)
+    """
+    mean = mean_ms / 1000
+    if mean <= 0:
+        return lambda: 0.0
+    if dist == "uniform":
+        return lambda: random.uniform(mean * (1 - jitter), mean * (1 + jitter))
+    if dist == "exponential":
+        return lambda: random.expovariate(1 / mean)
+    if dist == "lognormal":
+        # 평균이 mean이 되도록 mu 보정
+        mu = math.log(mean) - jitter ** 2 / 2
+        return lambda: random.lognormvariate(mu, jitter)
+    return lambda: mean
+
+
+def create_mock_app(records: list, latency, error_rate: float = 0.0, empty_rate: float = 0.0,
+                    rate_429: float = 0.0) -> web.Application:
+    """가짜 업스트림 aiohttp 애플리케이션 생성"""
+    stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "status": {}}
+
+    def count(status: int):
+        stats["status"][str(status)] = stats["status"].get(str(status), 0) + 1
+
+    async def product_search_popular(req: web.Request) -> web.Response:
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency())
+            roll = random.random()
+            if roll < rate_429:
+                count(429)
+                return web.Response(status=429, headers={"Retry-After": "1"})
+            roll -= rate_429
+            if roll < error_rate:
+                count(500)
+                return web.Response(status=500, text="Internal Server Error")
+            roll -= error_rate
+            count(200)
+            if roll < empty_rate:
+                return web.Response(body=b"", content_type="application/json")
+
+            nvmid = req.query.get("nvMid", "")
+            product = dict(records[zlib.crc32(nvmid.encode()) % len(records)])
+            product["nvmid"] = int(nvmid) if nvmid.isdigit() else nvmid
+            return web.Response(body=json_codec.dumps({"result": product}), content_type="application/json")
+        finally:
+            stats["in_flight"] -= 1
+
+    async def mock_stats(req: web.Request) -> web.Response:
+        return web.Response(body=json_codec.dumps(stats), content_type="application/json")
+
+    mock_app = web.Application()
+    mock_app.router.add_get(API_PATH, product_search_popular)
+    mock_app.router.add_get("/stats", mock_stats)
+    return mock_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 부하 테스트용 가짜 업스트림")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--source", default=str(Path(__file__).resolve().parent / "z.json"), help="상품을 가져올 z.json / zz.json")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="평균 응답 지연 (ms)")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "exponential", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-jitter", type=float, default=0.5, help="uniform: ±비율, lognormal: sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    parser.add_argument("--empty-rate", type=float, default=0.0, help="빈 본문 200 응답 비율 (0~1)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    args = parser.parse_args()
+
+    records = load_records(Path(args.source))
+    if not records:
+        parser.error(f"상품이 없습니다: {args.source}")
+    latency = make_latency_sampler(args.latency_dist, args.latency_ms, args.latency_jitter)
+    print(f"[mock] 상품 {len(records)}개, http://127.0.0.1:{args.port}{API_PATH}", flush=True)
+    web.run_app(create_mock_app(records, latency, args.error_rate, args.empty_rate, args.rate_429),
+                host="127.0.0.1", port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,21 +5,33 @@ z_nvmids.txt의 여러 nvmid에 대해 인기상품(상품 기본 정보)을 동
 - 쿠키/헤더는 한 번만 로드 (D:\\scorebill_V2\\scripts\\cookies2.json)
 - 각 nvmid 요청은 완전 병렬 처리
 - 마지막에 총 소요 시간 출력
+- 결과는 완료될 때마다 z_journal.jsonl에 한 줄씩 기록, --resume이면 이미 성공한 nvmid는 건너뜀
+  (--resume 없이 실행하면 기존 저널은 z_journal.<시각>.jsonl로 옮겨 두고 새로 시작)
+- --max-age=초: 저널을 이전 스냅샷으로 보고 max-age보다 오래됐거나 없거나 실패한 nvmid만 다시 조회해서 병합
+- --async: 스레드 대신 asyncio/aiohttp 엔진 (연결 풀 하나 공유, 동시 요청 --concurrency=N개, 기본 100)
 """
 
+import asyncio
 import json
+import os
 import sys
 import time
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
+import aiohttp
 import requests
 
+import json_codec
+
 # 쿠키/설정 파일 경로 (절대경로)
 SCOREBILL_SCRIPTS = Path(r"D:\scorebill_V2\scripts")
 CONFIG_FILE = SCOREBILL_SCRIPTS / "cookies2.json"
-API_URL = "https://sell.smartstore.naver.com/api/product/shared/product-search-popular"
+# UPSTREAM_BASE_URL로 업스트림 주소 변경 가능 (mock_upstream.py로 로컬 테스트)
+API_URL = os.environ.get("UPSTREAM_BASE_URL", "https://sell.smartstore.naver.com").rstrip("/") + "/api/product/shared/product-search-popular"
+JOURNAL_FILE = Path(__file__).resolve().parent / "z_journal.jsonl"
+ASYNC_CONCURRENCY = 100  # asyncio 엔진의 동시 요청 수 (= 공유 커넥터 연결 수)
 
 
 def load_config_once() -> Optional[Dict[str, Any]]:
@@ -60,35 +72,33 @@ def _session_from_config(config: Dict[str, Any], silent: bool = True) -> Optiona
     return session
 
 
-def fetch_one_productdata(nvmid: str, config: Dict[str, Any], silent: bool = True) -> Dict[str, Any]:
-    """
-    단일 nvmid에 대해 인기상품 API 호출.
-    config는 이미 로드된 cookies2.json 내용 (쿠키/헤더 한 번만 로드된 것).
-    """
-    nvmid = str(nvmid).strip()
-    if not nvmid:
-        return {"success": False, "error": "nvmid 없음", "nvmid": nvmid}
-
-    session = _session_from_config(config, silent=silent)
-    if not session:
-        return {"success": False, "error": "세션 생성 실패(쿠키 없음)", "nvmid": nvmid}
+def _request_headers_from_config(config: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """asyncio 엔진용: config 헤더에 쿠키를 Cookie 헤더로 합친 dict (쿠키가 없으면 None)."""
+    headers = dict(config.get("headers", {}))
+    cookies_data = config.get("cookies", {})
+    actual_cookies = cookies_data.get("dict_format", {})
+    cookie_string = cookies_data.get("string_format", "")
+    if actual_cookies:
+        headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in actual_cookies.items())
+    elif cookie_string:
+        headers["Cookie"] = cookie_string
+    else:
+        return None
+    return headers
 
-    params = {"_action": "productSearchPopularByCategory", "nvMid": nvmid}
-    try:
-        response = session.get(API_URL, params=params, timeout=30)
-    except Exception as e:
-        return {"success": False, "error": str(e), "nvmid": nvmid}
 
-    if response.status_code != 200:
+def parse_productdata(nvmid: str, status_code: int, content: bytes) -> Dict[str, Any]:
+    """인기상품 API 응답(상태 코드, 본문)을 결과 dict로 변환 (스레드 / asyncio 엔진 공용)."""
+    if status_code != 200:
         return {
             "success": False,
-            "error": f"HTTP {response.status_code}",
+            "error": f"HTTP {status_code}",
             "nvmid": nvmid,
         }
 
     try:
-        json_data = response.json()
-    except json.JSONDecodeError:
+        json_data = json_codec.loads(content)
+    except json_codec.JSONDecodeError:
         return {"success": False, "error": "JSON 파싱 실패", "nvmid": nvmid}
 
     if not isinstance(json_data, dict) or "result" not in json_data:
@@ -116,6 +126,48 @@ def fetch_one_productdata(nvmid: str, config: Dict[str, Any], silent: bool = Tru
     }
 
 
+def fetch_one_productdata(nvmid: str, config: Dict[str, Any], silent: bool = True) -> Dict[str, Any]:
+    """
+    단일 nvmid에 대해 인기상품 API 호출.
+    config는 이미 로드된 cookies2.json 내용 (쿠키/헤더 한 번만 로드된 것).
+    """
+    nvmid = str(nvmid).strip()
+    if not nvmid:
+        return {"success": False, "error": "nvmid 없음", "nvmid": nvmid}
+
+    session = _session_from_config(config, silent=silent)
+    if not session:
+        return {"success": False, "error": "세션 생성 실패(쿠키 없음)", "nvmid": nvmid}
+
+    params = {"_action": "productSearchPopularByCategory", "nvMid": nvmid}
+    try:
+        response = session.get(API_URL, params=params, timeout=30)
+    except Exception as e:
+        return {"success": False, "error": str(e), "nvmid": nvmid}
+
+    return parse_productdata(nvmid, response.status_code, response.content)
+
+
+async def fetch_one_productdata_async(session: aiohttp.ClientSession, nvmid: str) -> Dict[str, Any]:
+    """
+    fetch_one_productdata의 asyncio 버전. 쿠키/헤더는 session에 이미 들어 있음 (_run_async 참고).
+    결과 형태는 fetch_one_productdata와 같음.
+    """
+    nvmid = str(nvmid).strip()
+    if not nvmid:
+        return {"success": False, "error": "nvmid 없음", "nvmid": nvmid}
+
+    params = {"_action": "productSearchPopularByCategory", "nvMid": nvmid}
+    try:
+        async with session.get(API_URL, params=params) as response:
+            content = await response.read()
+            status_code = response.status
+    except Exception as e:
+        return {"success": False, "error": str(e) or type(e).__name__, "nvmid": nvmid}
+
+    return parse_productdata(nvmid, status_code, content)
+
+
 def load_nvmids(filepath: Path) -> List[str]:
     """파일에서 nvmid 목록 로드 (한 줄 하나, 빈 줄/공백 제거)."""
     if not filepath.exists():
@@ -125,9 +177,110 @@ def load_nvmids(filepath: Path) -> List[str]:
     return lines
 
 
-def run_multi(nvmid_file: Optional[Path] = None, silent: bool = False) -> Tuple[List[Dict[str, Any]], float]:
+def load_journal(journal_path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    저널(JSONL)에서 nvmid별 마지막 기록 로드. 반환: {nvmid: {"fetched_at": float, "result": dict}}
+    중단 시 마지막 줄이 덜 써졌을 수 있으므로 파싱 안 되는 줄은 건너뜀.
+    """
+    entries: Dict[str, Dict[str, Any]] = {}
+    if not journal_path.exists():
+        return entries
+    with open(journal_path, "rb") as f:
+        for line in f:
+            try:
+                entry = json_codec.loads(line)
+                entries[str(entry["result"]["nvmid"])] = entry
+            except (json_codec.JSONDecodeError, ValueError, KeyError, TypeError):
+                continue
+    return entries
+
+
+def rotate_journal(journal_path: Path) -> Optional[Path]:
+    """기존 저널이 비어 있지 않으면 <이름>.<시각>.jsonl로 옮겨 두고 옮긴 경로 반환 (없거나 비어 있으면 None)"""
+    if not journal_path.exists() or journal_path.stat().st_size == 0:
+        return None
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(journal_path.stat().st_mtime))
+    backup_path = journal_path.with_name(f"{journal_path.stem}.{stamp}{journal_path.suffix}")
+    os.replace(journal_path, backup_path)
+    return backup_path
+
+
+def rewrite_journal(journal_path: Path, entries: List[Dict[str, Any]]) -> None:
+    """저널을 entries만 남겨 다시 작성 (임시 파일에 쓴 뒤 교체해서 중간에 끊겨도 기존 저널 유지)."""
+    tmp_path = journal_path.with_name(journal_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        for entry in entries:
+            f.write(json_codec.dumps(entry) + b"\n")
+    os.replace(tmp_path, journal_path)
+
+
+ResultCallback = Callable[[str, Dict[str, Any]], None]
+
+
+def _run_threaded(nvmids: List[str], config: Dict[str, Any], on_result: ResultCallback) -> None:
+    """스레드 엔진: nvmid마다 스레드 1개, 요청마다 새 Session. 완료되는 순서대로 on_result(nvmid, 결과) 호출."""
+    with ThreadPoolExecutor(max_workers=len(nvmids)) as executor:
+        futures = {
+            executor.submit(fetch_one_productdata, nvmid, config, silent=True): nvmid
+            for nvmid in nvmids
+        }
+        try:
+            for future in as_completed(futures):
+                nvmid = futures[future]
+                try:
+                    out = future.result()
+                except Exception as e:
+                    out = {"success": False, "error": str(e), "nvmid": nvmid}
+                on_result(nvmid, out)
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+async def _run_async(nvmids: List[str], config: Dict[str, Any], on_result: ResultCallback,
+                     concurrency: int = ASYNC_CONCURRENCY) -> None:
+    """
+    asyncio 엔진: 세션/커넥터 하나를 모든 요청이 공유해서 keep-alive 연결을 재사용하고,
+    동시 요청은 concurrency개로 제한. 완료되는 순서대로 on_result(nvmid, 결과) 호출.
+    """
+    headers = _request_headers_from_config(config)
+    if headers is None:
+        for nvmid in nvmids:
+            on_result(nvmid, {"success": False, "error": "세션 생성 실패(쿠키 없음)", "nvmid": nvmid})
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=600)
+    # 연결 풀 대기 시간이 타임아웃에 들어가지 않도록 semaphore 안에서만 요청 (요청당 30초는 스레드 엔진과 같음)
+    timeout = aiohttp.ClientTimeout(total=30)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers,
+                                     cookie_jar=aiohttp.DummyCookieJar()) as session:
+        async def fetch(nvmid: str) -> Tuple[str, Dict[str, Any]]:
+            async with semaphore:
+                return nvmid, await fetch_one_productdata_async(session, nvmid)
+
+        tasks = [asyncio.ensure_future(fetch(nvmid)) for nvmid in nvmids]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                nvmid, out = await next_done
+                on_result(nvmid, out)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def run_multi(nvmid_file: Optional[Path] = None, silent: bool = False, resume: bool = False,
+              journal_path: Optional[Path] = None, max_age: Optional[float] = None,
+              use_async: bool = False, concurrency: int = ASYNC_CONCURRENCY) -> Tuple[List[Dict[str, Any]], float]:
     """
     여러 nvmid에 대해 쿠키/헤더 1회 로드 후 완전 병렬 조회.
+    use_async=True이면 스레드 대신 asyncio 엔진(_run_async, 동시 요청 concurrency개)으로 조회 (결과 형태는 같음).
+    결과는 완료될 때마다 저널(journal_path, 기본 z_journal.jsonl)에 추가 기록.
+    resume=True이면 저널에서 이미 성공한 nvmid는 다시 요청하지 않고 저널 결과를 사용
+    (아니면 기존 저널은 rotate_journal로 옮겨 두고 새로 시작, --resume을 빠뜨려도 중단 전 결과가 남음).
+    max_age(초)를 주면 갱신 모드: 저널에서 성공했고 max_age 이내에 받은 nvmid만 재사용하고,
+    오래됐거나 없거나 실패한 nvmid만 다시 조회해서 병합 (resume은 max_age 제한이 없는 갱신 모드와 같음).
     반환: (각 nvmid별 결과 리스트, 총 소요 시간 초).
     """
     script_dir = Path(__file__).resolve().parent
@@ -141,29 +294,54 @@ def run_multi(nvmid_file: Optional[Path] = None, silent: bool = False) -> Tuple[
     if not config:
         return [], 0.0
 
+    journal_path = journal_path or JOURNAL_FILE
+    results: List[Dict[str, Any]] = []
+    if resume or max_age is not None:
+        journal = load_journal(journal_path)
+        now = time.time()
+        done = set()
+        for nvmid in nvmids:
+            entry = journal.get(nvmid)
+            if entry and entry["result"].get("success") and (max_age is None or now - entry.get("fetched_at", 0) <= max_age):
+                done.add(nvmid)
+        results = [journal[nvmid]["result"] for nvmid in nvmids if nvmid in done]
+        total = len(nvmids)
+        nvmids = [nvmid for nvmid in nvmids if nvmid not in done]
+        # 다시 조회할 nvmid의 옛 기록은 지워서 저널이 실행마다 계속 커지지 않게 함
+        refetch = set(nvmids)
+        rewrite_journal(journal_path, [entry for key, entry in journal.items() if key not in refetch])
+        if not silent:
+            print(f"저널에서 {len(results)}/{total}건 재사용, nvmid {len(nvmids)}개만 다시 조회. ({journal_path})")
+    else:
+        backup_path = rotate_journal(journal_path)
+        if backup_path is not None:
+            print(f"기존 저널을 {backup_path.name}(으)로 옮기고 새로 시작합니다. (이어서 실행하려면 --resume)")
+
     if not silent:
         print(f"쿠키/헤더 1회 로드 완료. nvmid {len(nvmids)}개 병렬 조회 시작.")
 
-    results: List[Dict[str, Any]] = []
     start = time.perf_counter()
+    if not nvmids:
+        return results, 0.0
 
-    with ThreadPoolExecutor(max_workers=len(nvmids)) as executor:
-        futures = {
-            executor.submit(fetch_one_productdata, nvmid, config, silent=True): nvmid
-            for nvmid in nvmids
-        }
-        for future in as_completed(futures):
-            nvmid = futures[future]
-            try:
-                out = future.result()
-                results.append(out)
-                if not silent:
-                    status = "OK" if out.get("success") else out.get("error", "?")
-                    print(f"  [{nvmid}] {status}")
-            except Exception as e:
-                results.append({"success": False, "error": str(e), "nvmid": nvmid})
-                if not silent:
-                    print(f"  [{nvmid}] 예외: {e}")
+    with open(journal_path, "ab") as journal_file:
+        def on_result(nvmid: str, out: Dict[str, Any]) -> None:
+            if not silent:
+                status = "OK" if out.get("success") else out.get("error", "?")
+                print(f"  [{nvmid}] {status}")
+            results.append(out)
+            # 완료될 때마다 바로 기록 (중단돼도 여기까지는 --resume으로 재사용)
+            journal_file.write(json_codec.dumps({"fetched_at": time.time(), "result": out}) + b"\n")
+            journal_file.flush()
+
+        try:
+            if use_async:
+                asyncio.run(_run_async(nvmids, config, on_result, concurrency))
+            else:
+                _run_threaded(nvmids, config, on_result)
+        except KeyboardInterrupt:
+            print(f"\n중단됨: 완료된 {len(results)}건은 저널에 기록되었습니다. --resume으로 이어서 실행하세요. ({journal_path})")
+            raise
 
     elapsed = time.perf_counter() - start
     return results, elapsed
@@ -174,14 +352,17 @@ def save_results_to_json(results: List[Dict[str, Any]], elapsed: float, filepath
     if filepath is None:
         filepath = Path(__file__).resolve().parent / "z.json"
     data = {"results": results, "count": len(results), "elapsed_seconds": round(elapsed, 2)}
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    json_codec.dump_file(data, filepath)
     return filepath
 
 
 if __name__ == "__main__":
     silent = "--silent" in sys.argv
-    results, elapsed = run_multi(silent=silent)
+    resume = "--resume" in sys.argv
+    max_age = next((float(arg.split("=", 1)[1]) for arg in sys.argv if arg.startswith("--max-age=")), None)
+    use_async = "--async" in sys.argv
+    concurrency = next((int(arg.split("=", 1)[1]) for arg in sys.argv if arg.startswith("--concurrency=")), ASYNC_CONCURRENCY)
+    results, elapsed = run_multi(silent=silent, resume=resume, max_age=max_age, use_async=use_async, concurrency=concurrency)
     out_path = save_results_to_json(results, elapsed)
     success_count = sum(1 for r in results if r.get("success"))
     print(f"완료: 성공 {success_count}/{len(results)}건")
@@ -201,6 +201,20 @@ async function extractProductDataBatch(nvmids, cookies, headers, concurrency = 2
   };
 }
 
+/**
+ * 요청 본문 JSON 파싱 (Content-Encoding: gzip으로 압축된 본문은 해제 후 파싱)
+ * @param {Request} request - 들어온 요청
+ * @returns {object} 파싱된 JSON
+ */
+async function readJsonBody(request) {
+  const encoding = (request.headers.get('Content-Encoding') || '').toLowerCase();
+  if (encoding === 'gzip') {
+    const decompressed = request.body.pipeThrough(new DecompressionStream('gzip'));
+    return await new Response(decompressed).json();
+  }
+  return await request.json();
+}
+
 /**
  * Cloudflare Workers 메인 핸들러
  */
@@ -210,7 +224,7 @@ export default {
     const corsHeaders = {
       'Access-Control-Allow-Origin': '*',
       'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
-      'Access-Control-Allow-Headers': 'Content-Type, Authorization',
+      'Access-Control-Allow-Headers': 'Content-Type, Content-Encoding, Authorization',
       'Access-Control-Max-Age': '86400',
     };
 
@@ -238,7 +252,7 @@ export default {
 
     try {
       // 요청 파싱
-      const requestBody = await request.json();
+      const requestBody = await readJsonBody(request);
       const { nvmids, cookies, headers, concurrency = 50 } = requestBody;
 
       // 필수 파라미터 검증
@@ -11,6 +11,9 @@ import requests
 from pathlib import Path
 from datetime import datetime
 
+import compression
+import json_codec
+
 # 윈도우 환경에서 UTF-8 출력이 가능하도록 설정
 if sys.platform == "win32":
     import io
@@ -98,7 +101,8 @@ def call_workers_endpoint(
     nvmids_path: str = r"D:\render_test\z_nvmids.txt",
     scripts_dir: str = r"D:\scorebill_V2\scripts",
     output_dir: str = r"D:\render_test",
-    concurrency: int = 50
+    concurrency: int = 50,
+    compress: bool = True
 ):
     """
     Cloudflare Workers 엔드포인트를 호출합니다.
@@ -109,6 +113,7 @@ def call_workers_endpoint(
         scripts_dir (str): 스크립트 디렉토리 경로 (쿠키 파일 위치)
         output_dir (str): 결과 JSON 저장 경로
         concurrency (int): 동시 처리 수
+        compress (bool): 요청 본문 gzip 압축 여부 (응답은 requests가 Accept-Encoding으로 압축을 받아 자동 해제)
     """
     print(f"[START] Cloudflare Workers 호출 중: {workers_url}")
     print(f"[INFO] nvmids 파일: {nvmids_path}")
@@ -148,15 +153,23 @@ def call_workers_endpoint(
     try:
         start_time = datetime.now()
 
+        body = json_codec.dumps({
+            "nvmids": loaded_nvmids,
+            "cookies": cookies,
+            "headers": headers,
+            "concurrency": concurrency
+        })
+        request_headers = {"Content-Type": "application/json"}
+        if compress:
+            raw_size = len(body)
+            body = compression.compress(body, "gzip")
+            request_headers["Content-Encoding"] = "gzip"
+            print(f"[INFO] 요청 본문 gzip 압축: {raw_size:,} → {len(body):,} bytes")
+
         response = requests.post(
             f"{workers_url}/extract_productdata_batch",
-            json={
-                "nvmids": loaded_nvmids,
-                "cookies": cookies,
-                "headers": headers,
-                "concurrency": concurrency
-            },
-            headers={"Content-Type": "application/json"},
+            data=body,
+            headers=request_headers,
             timeout=300  # 5분 타임아웃 (Workers는 더 빠를 수 있음)
         )
 
@@ -166,9 +179,11 @@ def call_workers_endpoint(
         # 응답 처리
         print(f"\n[INFO] 상태 코드: {response.status_code}")
         print(f"[INFO] 소요 시간: {elapsed:.2f}초")
+        if response.headers.get("Content-Encoding"):
+            print(f"[INFO] 응답 압축: {response.headers['Content-Encoding']} ({len(response.content):,} bytes로 해제됨)")
 
         if response.status_code == 200:
-            result = response.json()
+            result = json_codec.loads(response.content)
 
             if result.get("success"):
                 print("[OK] 데이터 추출 성공!")
@@ -240,8 +255,7 @@ def call_workers_endpoint(
                 # 전체 결과 JSON 저장 (zz.json)
                 output_filename = Path(output_dir) / "zz_workers.json"
 
-                with open(output_filename, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
+                json_codec.dump_file(result, output_filename)
 
                 print(f"[OK] 결과가 저장되었습니다: {output_filename}")
                 print(f"\n[통계]")
@@ -253,7 +267,7 @@ def call_workers_endpoint(
                 print(f"[ERROR] 추출 실패: {result.get('error', '알 수 없는 오류')}")
         else:
             try:
-                error_data = response.json()
+                error_data = json_codec.loads(response.content)
                 print(f"[ERROR] API 오류: {error_data.get('error', '알 수 없는 오류')}")
             except:
                 print(f"[ERROR] HTTP 오류: {response.text}")
@@ -272,17 +286,21 @@ def call_workers_endpoint(
 if __name__ == "__main__":
     # 인자 파싱
     # 기본 Workers URL
+    # --no-compress: 요청 본문 gzip 압축 끄기 (위치 인자에서는 제외)
+    compress = "--no-compress" not in sys.argv
+    sys.argv = [arg for arg in sys.argv if arg != "--no-compress"]
     DEFAULT_WORKERS_URL = "https://naver-product-data.dreamad0929.workers.dev"
 
     # 인자가 없으면 도움말과 기본값 사용 안내
     if len(sys.argv) > 1 and sys.argv[1] in ['-h', '--help', 'help']:
-        print("사용법: python z_workers_endpoint.py [workers_url] [nvmids_path] [scripts_dir] [output_dir] [concurrency]")
+        print("사용법: python z_workers_endpoint.py [workers_url] [nvmids_path] [scripts_dir] [output_dir] [concurrency] [--no-compress]")
         print("\n인자:")
         print("  workers_url  : Workers URL (기본값: 배포된 URL)")
         print("  nvmids_path  : nvmids 파일 경로 (기본값: D:\\render_test\\z_nvmids.txt)")
         print("  scripts_dir  : 스크립트 디렉토리 (기본값: D:\\scorebill_V2\\scripts)")
         print("  output_dir   : 출력 디렉토리 (기본값: D:\\render_test)")
         print("  concurrency  : 동시 처리 수 (기본값: 50)")
+        print("  --no-compress: 요청 본문을 gzip으로 압축하지 않음")
         print("\n예시:")
         print("  python z_workers_endpoint.py")
         print(f"  → 기본 Workers URL 사용: {DEFAULT_WORKERS_URL}")
@@ -299,4 +317,4 @@ if __name__ == "__main__":
     output_dir = sys.argv[4] if len(sys.argv) > 4 else r"D:\render_test"
     concurrency = int(sys.argv[5]) if len(sys.argv) > 5 else 50
 
-    call_workers_endpoint(workers_url, nvmids_path, scripts_dir, output_dir, concurrency)
+    call_workers_endpoint(workers_url, nvmids_path, scripts_dir, output_dir, concurrency, compress)
@@ -3,13 +3,20 @@
 """
 Render에 배포된 /extract_productdata 엔드포인트 호출 스크립트
 nvmid는 커맨드 라인 인자로 입력, 쿠키는 로컬 파일에서 로드
-사용법: python 호출_extract_productdata.py <nvmid>
+사용법: python 호출_extract_productdata.py <nvmid> [service_url] [scripts_dir] [--msgpack]
 """
 import sys
 import json
 import requests
 from pathlib import Path
 
+import json_codec
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성 (--msgpack 옵션용)
+    msgpack = None
+
 # 윈도우 환경에서 UTF-8 출력이 가능하도록 설정
 if sys.platform == "win32":
     import io
@@ -77,10 +84,40 @@ def load_headers_from_file(cookies_path: Path) -> dict:
         return {}
 
 
+def decode_response_body(response) -> dict:
+    """
+    응답 본문 파싱 (Content-Type이 application/msgpack이면 MessagePack, 아니면 JSON)
+
+    Args:
+        response (requests.Response): 서버 응답
+
+    Returns:
+        dict: 파싱된 응답
+    """
+    if response.headers.get("Content-Type", "").startswith("application/msgpack"):
+        return msgpack.unpackb(response.content)
+    return json_codec.loads(response.content)
+
+
+def print_server_timing(header: str):
+    """
+    Server-Timing 헤더(서버 단계별 소요 시간)를 한 줄씩 출력합니다.
+    예: 'parse;dur=0.12, upstream;dur=85.30;desc="sum of 1", retry;desc="0 rounds"'
+    """
+    print("[서버 단계별 시간]")
+    for entry in header.split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        values = dict(param.split("=", 1) for param in params if "=" in param)
+        dur = f"{float(values['dur']):.2f}ms" if "dur" in values else ""
+        desc = values.get("desc", "").strip('"')
+        print(f"  - {name}: {dur}{' ' if dur and desc else ''}{f'({desc})' if desc else ''}")
+
+
 def call_extract_productdata(
     nvmid: str,
     service_url: str = "https://hello-world-fo9c.onrender.com",
-    scripts_dir: str = r"D:\scorebill_V2\scripts"
+    scripts_dir: str = r"D:\scorebill_V2\scripts",
+    msgpack_format: bool = False
 ):
     """
     Render 서비스의 /extract_productdata 엔드포인트를 호출합니다.
@@ -89,6 +126,7 @@ def call_extract_productdata(
         nvmid (str): 상품 NVM ID
         service_url (str): Render 서비스 URL
         scripts_dir (str): 스크립트 디렉토리 경로 (쿠키 파일 위치)
+        msgpack_format (bool): MessagePack 응답 요청 여부 (msgpack 패키지 필요)
     """
     print(f"[START] Render 서비스 호출 중: {service_url}/extract_productdata")
     print(f"[INFO] nvmid: {nvmid}")
@@ -116,6 +154,12 @@ def call_extract_productdata(
 
     # API 요청
     print("[INFO] POST 요청 전송 중...")
+    request_headers = {"Content-Type": "application/json"}
+    if msgpack_format:
+        if msgpack is None:
+            print("[WARN] msgpack 패키지가 없어 JSON으로 요청합니다. (pip install msgpack)")
+        else:
+            request_headers["Accept"] = "application/msgpack"
     try:
         response = requests.post(
             f"{service_url}/extract_productdata",
@@ -124,15 +168,17 @@ def call_extract_productdata(
                 "cookies": cookies,
                 "headers": headers
             },
-            headers={"Content-Type": "application/json"},
+            headers=request_headers,
             timeout=30
         )
 
         # 응답 처리
         print(f"\n[INFO] 상태 코드: {response.status_code}")
+        if response.headers.get("Server-Timing"):
+            print_server_timing(response.headers["Server-Timing"])
 
         if response.status_code == 200:
-            result = response.json()
+            result = decode_response_body(response)
             if result.get("success"):
                 print("[OK] 데이터 추출 성공!")
                 print(f"[INFO] nvmid: {result.get('nvmid')}")
@@ -159,7 +205,7 @@ def call_extract_productdata(
                 print(f"[ERROR] 추출 실패: {result.get('error', '알 수 없는 오류')}")
         else:
             try:
-                error_data = response.json()
+                error_data = decode_response_body(response)
                 print(f"[ERROR] API 오류: {error_data.get('error', '알 수 없는 오류')}")
             except:
                 print(f"[ERROR] HTTP 오류: {response.text}")
@@ -176,8 +222,12 @@ def call_extract_productdata(
 
 
 if __name__ == "__main__":
+    # --msgpack: MessagePack 응답 요청 (위치 인자에서는 제외)
+    msgpack_format = "--msgpack" in sys.argv
+    sys.argv = [arg for arg in sys.argv if arg != "--msgpack"]
+
     if len(sys.argv) < 2:
-        print("사용법: python 호출_extract_productdata.py <nvmid> [service_url] [scripts_dir]")
+        print("사용법: python 호출_extract_productdata.py <nvmid> [service_url] [scripts_dir] [--msgpack]")
         print("예시: python 호출_extract_productdata.py 84747291048")
         print("예시: python 호출_extract_productdata.py 84747291048 https://hello-world-fo9c.onrender.com")
         sys.exit(1)
@@ -186,4 +236,4 @@ if __name__ == "__main__":
     service_url = sys.argv[2] if len(sys.argv) > 2 else "https://hello-world-fo9c.onrender.com"
     scripts_dir = sys.argv[3] if len(sys.argv) > 3 else r"D:\scorebill_V2\scripts"
 
-    call_extract_productdata(nvmid, service_url, scripts_dir)
+    call_extract_productdata(nvmid, service_url, scripts_dir, msgpack_format)
@@ -3,14 +3,30 @@
 """
 Render에 배포된 /extract_productdata_multi 엔드포인트 호출 스크립트
 nvmid 목록을 파일에서 읽어서 병렬로 상품 데이터 추출
-사용법: python 호출_extract_productdata_multi.py
+사용법: python 호출_extract_productdata_multi.py [service_url] [nvmids_path] [scripts_dir] [output_dir] [--no-compress] [--no-columnar] [--msgpack] [--raw]
+        [--chunk-size=N] [--parallel=N] [--max-age=초]
 """
 import sys
+import os
 import json
+import time
+import hashlib
+import threading
 import requests
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+
+import columnar
+import compression
+import json_codec
+
+try:
+    import msgpack
+except ImportError:  # 선택 의존성 (--msgpack 옵션용)
+    msgpack = None
 
 # 윈도우 환경에서 UTF-8 출력이 가능하도록 설정
 if sys.platform == "win32":
@@ -94,11 +110,230 @@ def load_headers_from_file(cookies_path: Path) -> dict:
         return {}
 
 
+def decode_response_body(response) -> dict:
+    """
+    응답 본문 파싱 (Content-Type이 application/msgpack이면 MessagePack, 아니면 JSON)
+
+    Args:
+        response (requests.Response): 서버 응답
+
+    Returns:
+        dict: 파싱된 응답
+    """
+    if response.headers.get("Content-Type", "").startswith("application/msgpack"):
+        return msgpack.unpackb(response.content)
+    return json_codec.loads(response.content)
+
+
+# 업로드를 나누는 단위 / 동시에 보내는 요청 수 (커맨드 라인 --chunk-size, --parallel로 변경)
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_PARALLEL = 4
+CHUNK_TIMEOUT = 120  # chunk 요청 하나의 타임아웃 (초)
+CHUNK_RETRIES = 2  # 타임아웃 / 연결 오류 / 5xx일 때 chunk별 재시도 횟수
+
+
+def create_session(pool_size: int) -> requests.Session:
+    """chunk 요청들이 keep-alive 연결을 재사용하도록 동시 요청 수만큼 연결 풀을 둔 세션 생성"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def request_chunk(session: requests.Session, service_url: str, nvmids: list, cookies: str, headers: dict,
+                  compress: bool, columnar_format: bool, msgpack_format: bool, raw_mode: bool,
+                  no_cache: bool = False) -> dict:
+    """
+    nvmid chunk 하나를 /extract_productdata_multi로 요청하고 응답 payload를 그대로 반환합니다.
+    타임아웃 / 연결 오류 / 5xx는 CHUNK_RETRIES번까지 재시도합니다.
+
+    Returns:
+        dict: 서버 응답 (format에 따라 results 또는 columnar 필드)
+
+    Raises:
+        RuntimeError: 재시도 후에도 실패했거나 서버가 실패 응답을 보낸 경우
+    """
+    request_body = {
+        "nvmids": nvmids,
+        "cookies": cookies,
+        "headers": headers,
+        "format": "columnar" if columnar_format else "json",
+        "raw": raw_mode,
+        "timing": True,  # 서버 단계별 소요 시간 (통계 출력용)
+    }
+    if no_cache:
+        # 갱신 모드에서 다시 요청하는 nvmid는 이미 오래된 결과이므로 서버 캐시를 거치지 않고 업스트림에서 새로 받음
+        # (캐시 결과를 받은 시각을 지금으로 기록하면 다음 갱신에서 실제보다 새 결과로 취급됨)
+        request_body["no_cache"] = True
+    body = json_codec.dumps(request_body)
+    request_headers = {"Content-Type": "application/json"}
+    if msgpack_format:
+        request_headers["Accept"] = "application/msgpack"
+    if compress:
+        body = compression.compress(body, "gzip")
+        request_headers["Content-Encoding"] = "gzip"
+
+    for attempt in range(CHUNK_RETRIES + 1):
+        try:
+            response = session.post(
+                f"{service_url}/extract_productdata_multi",
+                data=body,
+                headers=request_headers,
+                timeout=CHUNK_TIMEOUT
+            )
+        except requests.exceptions.RequestException as e:
+            error = f"요청 실패: {e}"
+        else:
+            if response.status_code == 200:
+                payload = decode_response_body(response)
+                if not payload.get("success"):
+                    raise RuntimeError(f"추출 실패: {payload.get('error', '알 수 없는 오류')}")
+                return payload
+            try:
+                error = f"API 오류 ({response.status_code}): {decode_response_body(response).get('error', '알 수 없는 오류')}"
+            except Exception:
+                error = f"HTTP 오류 ({response.status_code}): {response.text[:200]}"
+            if response.status_code < 500:
+                raise RuntimeError(error)
+        if attempt < CHUNK_RETRIES:
+            time.sleep(2 ** attempt)
+    raise RuntimeError(error)
+
+
+def merge_chunk_timings(payloads) -> dict | None:
+    """
+    chunk 응답의 timing 블록(서버 단계별 소요 시간, ms)을 합칩니다.
+    *_max_ms는 최댓값, 나머지는 합계. timing이 있는 chunk가 없으면 None
+    """
+    merged = None
+    for payload in payloads:
+        timing = payload.get("timing")
+        if not timing:
+            continue
+        if merged is None:
+            merged = dict(timing)
+            continue
+        for key, value in timing.items():
+            if key.endswith("_max_ms"):
+                merged[key] = max(merged.get(key, 0), value)
+            else:
+                merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def decode_chunk_results(payload: dict) -> list:
+    """
+    chunk 응답에서 결과 리스트를 기존 results 형태로 꺼냅니다.
+    columnar 형식은 ColumnarResults로 감싸서 dict를 접근할 때 만들고,
+    raw 모드에서 product 옆에 온 openDateFormatted는 기존 zz.json 형태로 product 안에 넣습니다.
+    """
+    if payload.get("format") == "columnar":
+        return columnar.ColumnarResults(payload)
+    results = payload.get("results", [])
+    for r in results:
+        if r and "openDateFormatted" in r:
+            open_date_formatted = r.pop("openDateFormatted")
+            if r.get("product") is not None:
+                r["product"]["openDateFormatted"] = open_date_formatted
+    return results
+
+
+def load_previous_snapshot(snapshot_path: Path) -> dict:
+    """
+    이전 zz.json에서 nvmid별 (결과, 받은 시각)을 로드합니다.
+    fetched_at 표가 없는 예전 파일은 파일 수정 시각을 모든 결과의 받은 시각으로 봅니다.
+
+    Returns:
+        dict: {nvmid: (결과 dict, 받은 시각 epoch 초)}, 파일이 없거나 읽을 수 없으면 빈 dict
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            data = json_codec.loads(f.read())
+        file_time = os.path.getmtime(snapshot_path)
+    except (OSError, json_codec.JSONDecodeError, ValueError):
+        return {}
+    fetched_at = data.get("fetched_at") or {}
+    snapshot = {}
+    for r in data.get("results") or []:
+        if isinstance(r, dict) and r.get("nvmid") is not None:
+            nvmid = str(r["nvmid"])
+            snapshot[nvmid] = (r, fetched_at.get(nvmid, file_time))
+    return snapshot
+
+
+def chunk_run_id(unique_nvmids: list, chunk_size: int) -> str:
+    """nvmid 목록과 chunk 크기가 같을 때만 이전 실행의 chunk 결과를 재사용하기 위한 식별자"""
+    digest = hashlib.sha256(json_codec.dumps([chunk_size, unique_nvmids]))
+    return digest.hexdigest()
+
+
+class ChunkState:
+    """
+    완료된 chunk 응답을 한 줄씩 추가 기록하는 상태 파일 (JSON Lines)
+    첫 줄은 {"run_id": ...}, 이후 줄은 {"chunk": 번호, "payload": 서버 응답}
+    중간에 끊겨도 다시 실행하면 기록된 chunk는 건너뛰고 나머지만 요청합니다.
+    """
+
+    def __init__(self, path: Path, run_id: str):
+        self.path = path
+        self.run_id = run_id
+        self._lock = threading.Lock()
+
+    def load(self) -> dict:
+        """같은 run_id로 기록된 chunk 결과 {chunk 번호: payload} 반환 (없거나 다른 실행이면 새로 시작)"""
+        try:
+            with open(self.path, "rb") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            lines = []
+        try:
+            same_run = bool(lines) and json_codec.loads(lines[0]).get("run_id") == self.run_id
+        except (json_codec.JSONDecodeError, ValueError, AttributeError):
+            same_run = False
+
+        finished = {}
+        if same_run:
+            for line in lines[1:]:
+                try:
+                    entry = json_codec.loads(line)
+                    finished[entry["chunk"]] = entry["payload"]
+                except (json_codec.JSONDecodeError, ValueError, KeyError):
+                    break  # 기록 도중 끊긴 줄: 그 앞까지만 사용하고 아래에서 파일을 정리
+            else:
+                return finished
+
+        # 다른 실행의 파일이거나 끊긴 줄이 있으면 온전한 chunk만 남겨 새로 작성
+        with open(self.path, "wb") as f:
+            f.write(json_codec.dumps({"run_id": self.run_id}) + b"\n")
+            for idx, payload in finished.items():
+                f.write(json_codec.dumps({"chunk": idx, "payload": payload}) + b"\n")
+        return finished
+
+    def record(self, idx: int, payload: dict):
+        line = json_codec.dumps({"chunk": idx, "payload": payload}) + b"\n"
+        with self._lock, open(self.path, "ab") as f:
+            f.write(line)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
 def call_extract_productdata_multi(
     service_url: str = "https://hello-world-fo9c.onrender.com",
     nvmids_path: str = r"D:\render_test\z_nvmids.txt",
     scripts_dir: str = r"D:\scorebill_V2\scripts",
-    output_dir: str = r"D:\render_test"
+    output_dir: str = r"D:\render_test",
+    compress: bool = True,
+    columnar_format: bool = True,
+    msgpack_format: bool = False,
+    raw_mode: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    parallel: int = DEFAULT_PARALLEL,
+    max_age: float | None = None
 ):
     """
     Render 서비스의 /extract_productdata_multi 엔드포인트를 호출합니다.
@@ -108,6 +343,14 @@ def call_extract_productdata_multi(
         nvmids_path (str): nvmids 파일 경로
         scripts_dir (str): 스크립트 디렉토리 경로 (쿠키 파일 위치)
         output_dir (str): 결과 JSON 저장 경로
+        compress (bool): 요청 본문 gzip 압축 여부 (응답은 requests가 Accept-Encoding으로 압축을 받아 자동 해제)
+        columnar_format (bool): columnar 응답 형식 요청 여부 (키 이름 반복 없이 받아서 dict는 필요할 때 복원)
+        msgpack_format (bool): MessagePack 응답 요청 여부 (msgpack 패키지 필요, 저장은 그대로 zz.json)
+        raw_mode (bool): 서버 raw 모드 요청 (업스트림 원문 그대로 전달, columnar / msgpack 대신 JSON으로 받음)
+        chunk_size (int): 요청 하나에 담을 nvmid 수 (중복 제거 후 기준)
+        parallel (int): 동시에 보낼 chunk 요청 수 (하나의 keep-alive 세션 공유)
+        max_age (float | None): 갱신 모드 (초). 이전 zz.json에서 max_age 이내에 성공한 결과는 재사용하고
+            오래됐거나 없거나 실패한 nvmid만 서버 캐시 없이(no_cache) 요청해서 전체 결과로 병합
     """
     print(f"[START] Render 서비스 호출 중: {service_url}/extract_productdata_multi")
     print(f"[INFO] nvmids 파일: {nvmids_path}")
@@ -157,159 +400,223 @@ def call_extract_productdata_multi(
     else:
         print(f"[OK] 헤더 로드 완료 ({len(headers)} items)\n")
 
-    # API 요청
-    print(f"[INFO] POST 요청 전송 중... (nvmids: {len(unique_nvmids)}개)")
+    # API 요청 (chunk 단위로 나눠 여러 개를 동시에 전송)
+    if raw_mode:
+        columnar_format = False
+        msgpack_format = False
+    if msgpack_format and msgpack is None:
+        print("[WARN] msgpack 패키지가 없어 JSON으로 요청합니다. (pip install msgpack)")
+        msgpack_format = False
+
+    # 갱신 모드: 이전 zz.json에서 max_age 이내에 성공한 결과는 다시 요청하지 않음
+    output_filename = Path(output_dir) / "zz.json"
+    reused = {}
+    if max_age is not None:
+        now = time.time()
+        previous = load_previous_snapshot(output_filename)
+        for nvmid in unique_nvmids:
+            entry = previous.get(nvmid)
+            if entry and entry[0].get("success") and now - entry[1] <= max_age:
+                reused[nvmid] = entry
+        print(f"[INFO] 갱신 모드 (max-age {max_age:g}초): 이전 결과 {len(reused)}/{len(unique_nvmids)}개 재사용, "
+              f"{len(unique_nvmids) - len(reused)}개만 요청")
+    request_nvmids = [nvmid for nvmid in unique_nvmids if nvmid not in reused]
+
+    chunks = [request_nvmids[i:i + chunk_size] for i in range(0, len(request_nvmids), chunk_size)]
+    state = ChunkState(Path(output_dir) / "zz_chunks_state.jsonl", chunk_run_id(request_nvmids, chunk_size))
+    finished = state.load()
+    pending_chunks = [idx for idx in range(len(chunks)) if idx not in finished]
+    if finished:
+        print(f"[INFO] 이전 실행에서 완료된 chunk {len(finished)}개를 재사용합니다. ({state.path})")
+    print(f"[INFO] POST 요청 전송 중... (nvmids: {len(request_nvmids)}개, chunk {len(pending_chunks)}/{len(chunks)}개, "
+          f"chunk 크기: {chunk_size}, 동시 요청: {parallel})")
+
+    failed_chunks = {}
+    start_time = datetime.now()
     try:
-        start_time = datetime.now()
-
-        response = requests.post(
-            f"{service_url}/extract_productdata_multi",
-            json={
-                "nvmids": unique_nvmids,
-                "cookies": cookies,
-                "headers": headers,
-            },
-            headers={"Content-Type": "application/json"},
-            timeout=120  # 2분 타임아웃
-        )
-
-        end_time = datetime.now()
-        elapsed = (end_time - start_time).total_seconds()
-
-        # 응답 처리
-        print(f"\n[INFO] 상태 코드: {response.status_code}")
-        print(f"[INFO] 소요 시간: {elapsed:.2f}초")
-
-        if response.status_code == 200:
-            result = response.json()
-            if result.get("success"):
-                print("[OK] 데이터 추출 성공!")
-                print(f"[INFO] 전체: {result.get('total')}개")
-                print(f"[INFO] 성공: {result.get('success_count')}개")
-                print(f"[INFO] 실패: {result.get('fail_count')}개")
-
-                # 서버 응답 결과 (중복 제거된 상태)
-                unique_results = result.get("results", [])
-
-                # 중복 복원: 원래 순서대로 결과 배치
-                results = [None] * len(loaded_nvmids)
-                for unique_idx, r in enumerate(unique_results):
-                    if unique_idx < len(unique_nvmids):
-                        nvmid = unique_nvmids[unique_idx]
-                        # 해당 nvmid의 모든 인덱스 위치에 같은 결과 복사
-                        for original_idx in nvmid_to_indices[nvmid]:
-                            results[original_idx] = r
-
-                # None 객체 필터링 후 success 여부 확인
-                success_results = [r for r in results if r and isinstance(r, dict) and r.get("success")]
-                # None 객체는 실패로 처리 (서버 버그 대응)
-                fail_results = []
-                # 실패한 항목들의 nvmid를 찾기 위해 (인덱스, 결과) 쌍 저장
-                for idx, r in enumerate(results):
-                    if r is None or (r and isinstance(r, dict) and not r.get("success")):
-                        # 실패한 항목: 인덱스와 결과를 함께 저장
-                        fail_results.append((idx, r, loaded_nvmids[idx] if idx < len(loaded_nvmids) else "N/A"))
-
-                # 성공/실패 카운트 출력
-                actual_total = len(loaded_nvmids)
-                actual_success_count = len(success_results)
-                actual_fail_count = len(fail_results)
-
-                print(f"\n{'='*50}")
-                print(f"[결과 요약]")
-                print(f"  총 요청: {actual_total}개")
-                print(f"  성공: {actual_success_count}개")
-                print(f"  실패: {actual_fail_count}개")
-                if duplicates > 0:
-                    print(f"  ℹ️  중복 제거: {duplicates}개 → {len(unique_nvmids)}개 요청")
-                if actual_total > 0:
-                    print(f"  성공률: {actual_success_count / actual_total * 100:.1f}%")
-                else:
-                    print(f"  성공률: N/A (total이 0)")
-                print(f"{'='*50}\n")
-
-                # 성공한 상품 정보 출력 (처음 5개)
-                if success_results:
-                    print(f"[성공한 상품 예시 (처음 5개)]")
-                    for i, r in enumerate(success_results[:5]):
-                        nvmid = r.get('nvmid', 'N/A') if r else 'N/A'
-                        product = r.get("product") if r else None
-                        if product:  # product가 None이 아닐 때만 접근
-                            print(f"  {i+1}. NvMid: {nvmid}")
-                            print(f"     상품명: {product.get('productTitle', 'N/A')}")
-                            print(f"     몰 이름: {product.get('mallName', 'N/A')}")
-                            print()
-                        else:
-                            print(f"  {i+1}. NvMid: {nvmid}")
-                            print(f"     상품 데이터 없음")
-                            print()
-
-                # 실패한 경우 에러 출력
-                if fail_results:
-                    print(f"[실패한 항목 (처음 5개)]")
-                    for i, (idx, r, nvmid) in enumerate(fail_results[:5]):
-                        if r is None:
-                            print(f"  {i+1}. NvMid: {nvmid} (인덱스: {idx})")
-                            print(f"     에러: 데이터 없음 (null)")
-                            print()
-                        elif isinstance(r, dict):
-                            error = r.get('error', 'Unknown')
-                            print(f"  {i+1}. NvMid: {nvmid} (인덱스: {idx})")
-                            print(f"     에러: {error}")
-                            print()
-                        else:
-                            print(f"  {i+1}. NvMid: {nvmid} (인덱스: {idx})")
-                            print(f"     알 수 없는 형태: {type(r)}")
-                            print()
-
-                # 전체 결과 JSON 저장 (zz.json)
-                # 복원된 결과를 저장하기 위해 result 업데이트
-                result['results'] = results
-                result['total'] = len(loaded_nvmids)
-                result['success_count'] = len(success_results)
-                result['fail_count'] = len(fail_results)
-                result['original_unique_nvmids'] = len(unique_nvmids)
-                result['duplicates_removed'] = duplicates
-
-                output_filename = Path(output_dir) / "zz.json"
-
-                with open(output_filename, 'w', encoding='utf-8') as f:
-                    json.dump(result, f, ensure_ascii=False, indent=2)
-
-                print(f"[OK] 결과가 저장되었습니다: {output_filename}")
-                print(f"\n[통계]")
-                print(f"  - 총 상품 수: {len(success_results)}")
-                if len(unique_nvmids) > 0:
-                    print(f"  - 평균 응답 시간: {elapsed / len(unique_nvmids):.2f}초/개")
-                else:
-                    print(f"  - 평균 응답 시간: N/A (nvmids가 0개)")
-            else:
-                print(f"[ERROR] 추출 실패: {result.get('error', '알 수 없는 오류')}")
-        else:
-            try:
-                error_data = response.json()
-                print(f"[ERROR] API 오류: {error_data.get('error', '알 수 없는 오류')}")
-            except:
-                print(f"[ERROR] HTTP 오류: {response.text}")
-
-    except requests.exceptions.Timeout:
-        print("[ERROR] 요청 시간 초과 (120초)")
-    except requests.exceptions.RequestException as e:
-        print(f"[ERROR] 요청 실패: {e}")
+        with create_session(parallel) as session, ThreadPoolExecutor(max_workers=parallel) as executor:
+            futures = {
+                executor.submit(
+                    request_chunk, session, service_url, chunks[idx], cookies, headers,
+                    compress, columnar_format, msgpack_format, raw_mode, max_age is not None
+                ): idx
+                for idx in pending_chunks
+            }
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    payload = future.result()
+                except Exception as e:
+                    failed_chunks[idx] = str(e)
+                    print(f"[WARN] chunk {idx + 1}/{len(chunks)} 실패: {e}")
+                    continue
+                payload["fetched_at"] = time.time()  # 갱신 모드에서 결과 나이 판단용 (zz.json의 fetched_at)
+                finished[idx] = payload
+                state.record(idx, payload)
+                print(f"[INFO] chunk {idx + 1}/{len(chunks)} 완료 "
+                      f"(성공 {payload.get('success_count')} / 실패 {payload.get('fail_count')}, 누적 {len(finished)}/{len(chunks)})")
     except Exception as e:
         print(f"[ERROR] 예기치 않은 오류: {e}")
         print("\n[TRACEBACK]")
         traceback.print_exc()
 
+    end_time = datetime.now()
+    elapsed = (end_time - start_time).total_seconds()
+    print(f"\n[INFO] 소요 시간: {elapsed:.2f}초")
+
+    if not finished and not reused:
+        print("[ERROR] 완료된 chunk가 없습니다.")
+        print("\n" + "=" * 50)
+        print("[DONE] 요청 완료!")
+        return
+
+    # chunk 결과를 nvmid별 (결과, 받은 시각)으로 모음
+    fetched = {}
+    for idx, payload in finished.items():
+        fetched_at = payload.get("fetched_at", start_time.timestamp())
+        for offset, r in enumerate(decode_chunk_results(payload)):
+            fetched[chunks[idx][offset]] = (r, fetched_at)
+
+    # 새로 받은 결과 + 재사용한 이전 결과를 병합하고 중복 복원: 원래 순서대로 결과 배치
+    results = [None] * len(loaded_nvmids)
+    snapshot_times = {}
+    for nvmid in unique_nvmids:
+        entry = fetched.get(nvmid) or reused.get(nvmid)
+        if entry is None:
+            continue
+        r, snapshot_times[nvmid] = entry
+        # 해당 nvmid의 모든 인덱스 위치에 같은 결과 복사
+        for original_idx in nvmid_to_indices[nvmid]:
+            results[original_idx] = r
+
+    # None 객체 필터링 후 success 여부 확인
+    success_results = [r for r in results if r and isinstance(r, dict) and r.get("success")]
+    # None 객체는 실패로 처리 (요청하지 못한 chunk 포함)
+    fail_results = []
+    # 실패한 항목들의 nvmid를 찾기 위해 (인덱스, 결과) 쌍 저장
+    for idx, r in enumerate(results):
+        if r is None or (r and isinstance(r, dict) and not r.get("success")):
+            # 실패한 항목: 인덱스와 결과를 함께 저장
+            fail_results.append((idx, r, loaded_nvmids[idx] if idx < len(loaded_nvmids) else "N/A"))
+
+    # 성공/실패 카운트 출력
+    actual_total = len(loaded_nvmids)
+    actual_success_count = len(success_results)
+    actual_fail_count = len(fail_results)
+
+    print(f"\n{'='*50}")
+    print(f"[결과 요약]")
+    print(f"  총 요청: {actual_total}개")
+    print(f"  성공: {actual_success_count}개")
+    print(f"  실패: {actual_fail_count}개")
+    if duplicates > 0:
+        print(f"  ℹ️  중복 제거: {duplicates}개 → {len(unique_nvmids)}개 요청")
+    if reused:
+        print(f"  ℹ️  갱신 모드: {len(reused)}개 재사용, {len(request_nvmids)}개만 요청")
+    if failed_chunks:
+        print(f"  ⚠️  실패한 chunk: {len(failed_chunks)}개 (다시 실행하면 이 chunk만 요청)")
+    if actual_total > 0:
+        print(f"  성공률: {actual_success_count / actual_total * 100:.1f}%")
+    else:
+        print(f"  성공률: N/A (total이 0)")
+    print(f"{'='*50}\n")
+
+    # 성공한 상품 정보 출력 (처음 5개)
+    if success_results:
+        print(f"[성공한 상품 예시 (처음 5개)]")
+        for i, r in enumerate(success_results[:5]):
+            nvmid = r.get('nvmid', 'N/A') if r else 'N/A'
+            product = r.get("product") if r else None
+            if product:  # product가 None이 아닐 때만 접근
+                print(f"  {i+1}. NvMid: {nvmid}")
+                print(f"     상품명: {product.get('productTitle', 'N/A')}")
+                print(f"     몰 이름: {product.get('mallName', 'N/A')}")
+                print()
+            else:
+                print(f"  {i+1}. NvMid: {nvmid}")
+                print(f"     상품 데이터 없음")
+                print()
+
+    # 실패한 경우 에러 출력
+    if fail_results:
+        print(f"[실패한 항목 (처음 5개)]")
+        for i, (idx, r, nvmid) in enumerate(fail_results[:5]):
+            if r is None:
+                print(f"  {i+1}. NvMid: {nvmid} (인덱스: {idx})")
+                print(f"     에러: 데이터 없음 (null)")
+                print()
+            elif isinstance(r, dict):
+                error = r.get('error', 'Unknown')
+                print(f"  {i+1}. NvMid: {nvmid} (인덱스: {idx})")
+                print(f"     에러: {error}")
+                print()
+            else:
+                print(f"  {i+1}. NvMid: {nvmid} (인덱스: {idx})")
+                print(f"     알 수 없는 형태: {type(r)}")
+                print()
+
+    # 전체 결과 JSON 저장 (zz.json)
+    result = {
+        "success": True,
+        "total": len(loaded_nvmids),
+        "success_count": len(success_results),
+        "fail_count": len(fail_results),
+        "original_unique_nvmids": len(unique_nvmids),
+        "duplicates_removed": duplicates,
+        "results": results,
+        "fetched_at": snapshot_times,  # nvmid -> 받은 시각 (다음 --max-age 갱신에서 사용)
+    }
+
+    json_codec.dump_file(result, output_filename)
+
+    print(f"[OK] 결과가 저장되었습니다: {output_filename}")
+    if not failed_chunks:
+        # 모든 chunk가 끝났으면 이어받기용 상태 파일은 필요 없음
+        state.remove()
+    print(f"\n[통계]")
+    print(f"  - 총 상품 수: {len(success_results)}")
+    if len(request_nvmids) > 0:
+        print(f"  - 평균 응답 시간: {elapsed / len(request_nvmids):.2f}초/개")
+    else:
+        print(f"  - 평균 응답 시간: N/A (요청한 nvmid가 0개)")
+    server_timing = merge_chunk_timings(finished.values())
+    if server_timing:
+        print(f"  - 서버 단계별 시간 (chunk {len(finished)}개 합계, *_max는 최댓값):")
+        print(f"      파싱 {server_timing.get('parse_ms', 0):.1f}ms / "
+              f"큐 대기 {server_timing.get('queue_ms', 0):.1f}ms (최대 {server_timing.get('queue_max_ms', 0):.1f}ms)")
+        print(f"      업스트림 {server_timing.get('upstream_ms', 0):.1f}ms / {server_timing.get('upstream_requests', 0)}건 "
+              f"(최대 {server_timing.get('upstream_max_ms', 0):.1f}ms)")
+        print(f"      요청 수 제한 대기 {server_timing.get('rate_wait_ms', 0):.1f}ms / "
+              f"재시도 {server_timing.get('retry_rounds', 0)}회 / 서버 전체 {server_timing.get('total_ms', 0):.1f}ms")
+
     print("\n" + "=" * 50)
     print("[DONE] 요청 완료!")
 
 
 if __name__ == "__main__":
-    # 인자 파싈
+    # 인자 파싱
+    # 옵션 (위치 인자에서는 제외)
+    #   --no-compress: 요청 본문 gzip 압축 끄기
+    #   --no-columnar: 기존 results(dict 리스트) 형식으로 응답 받기
+    #   --msgpack: MessagePack 응답 요청 (결과 파일은 그대로 zz.json)
+    #   --raw: 서버 raw 모드 (업스트림 원문 전달, --no-columnar / msgpack 없이 동작)
+    #   --chunk-size=N: 요청 하나에 담을 nvmid 수 (기본값: 1000)
+    #   --parallel=N: 동시에 보낼 chunk 요청 수 (기본값: 4)
+    #   --max-age=초: 갱신 모드 (이전 zz.json에서 이 시간 이내에 성공한 결과는 재사용, 나머지만 요청)
+    options = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    sys.argv = [arg for arg in sys.argv if arg not in options]
+    option_values = dict(opt[2:].split("=", 1) if "=" in opt else (opt[2:], "") for opt in options)
+    compress = "no-compress" not in option_values
+    columnar_format = "no-columnar" not in option_values
+    msgpack_format = "msgpack" in option_values
+    raw_mode = "raw" in option_values
+    chunk_size = int(option_values.get("chunk-size") or DEFAULT_CHUNK_SIZE)
+    parallel = int(option_values.get("parallel") or DEFAULT_PARALLEL)
+    max_age = float(option_values["max-age"]) if option_values.get("max-age") else None
     service_url = sys.argv[1] if len(sys.argv) > 1 else "https://hello-world-fo9c.onrender.com"
     nvmids_path = sys.argv[2] if len(sys.argv) > 2 else r"D:\render_test\z_nvmids.txt"
     scripts_dir = sys.argv[3] if len(sys.argv) > 3 else r"D:\scorebill_V2\scripts"
     output_dir = sys.argv[4] if len(sys.argv) > 4 else r"D:\render_test"
 
-    call_extract_productdata_multi(service_url, nvmids_path, scripts_dir, output_dir)
+    call_extract_productdata_multi(service_url, nvmids_path, scripts_dir, output_dir, compress, columnar_format,
+                                   msgpack_format, raw_mode, chunk_size, parallel, max_age)